@@ -1,20 +1,110 @@
+import os
 from flask import Flask
+from sqlalchemy.orm import configure_mappers
 from database.db import db
-from database.config import DATABASE_CONNECTION_URI
-from routes import endpoints
+from database.config import DATABASE_CONNECTION_URI, DATABASE_ENGINE_OPTIONS, DATABASE_BINDS, engine_options
+from database.routing import replicas
+from routes import commands, endpoints
 from flask_migrate import Migrate
 from flask_cors import CORS
+from helpers.assets import assets
+from helpers.cache import api_cache
+from helpers.compression import compressor
+from helpers.images import images
+from helpers.jobs import jobs
+from helpers.metrics import metrics
 
-app = Flask(__name__)
-CORS(app)
 
-app.secret_key = "secret key"
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_CONNECTION_URI
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Crea la app; "config" pisa los valores leídos del entorno (pruebas, benchmarks, otra base).
+# No abre conexiones ni crea el esquema: eso queda para "flask create-schema" y las migraciones
+def create_app(config=None):
+    app = Flask(__name__)
+    CORS(app)
 
-db.init_app(app)
+    app.secret_key = "secret key"
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_CONNECTION_URI
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = DATABASE_ENGINE_OPTIONS
+    app.config['SQLALCHEMY_BINDS'] = DATABASE_BINDS
+    app.config['REPLICA_RETRY_AFTER'] = int(os.environ.get('REPLICA_RETRY_AFTER', 30))
+    app.config['REPLICA_STICKY_SECONDS'] = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
 
-migrate = Migrate(app, db)
+    # Caché de respuestas de la API pública ("memory" o "redis")
+    app.config['API_CACHE_ENABLED'] = os.environ.get('API_CACHE_ENABLED', 'true').lower() in \
+        ('1', 'true', 'yes')
+    app.config['API_CACHE_BACKEND'] = os.environ.get('API_CACHE_BACKEND', 'memory')
+    app.config['API_CACHE_REDIS_URL'] = os.environ.get('API_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    app.config['API_CACHE_TTL'] = int(os.environ.get('API_CACHE_TTL', 60))
+    app.config['API_CACHE_MAX_ENTRIES'] = int(os.environ.get('API_CACHE_MAX_ENTRIES', 1024))
 
-# Aquí se registran las rutas
-endpoints.init_app(app)
+    # Tiempo que un worker reutiliza los datos del admin autenticado sin consultar la base (y por lo tanto
+    # el máximo que sigue aceptando un admin modificado o borrado)
+    app.config['ADMIN_CACHE_TTL'] = int(os.environ.get('ADMIN_CACHE_TTL', 30))
+
+    # Directorio del export estático (flask export-static); si está definido, las rutas de
+    # escritura del admin reescriben ahí los archivos afectados
+    app.config['STATIC_EXPORT_DIR'] = os.environ.get('STATIC_EXPORT_DIR')
+
+    # Variantes de imágenes generadas por helpers/images.py y servidas desde /media
+    app.config['IMAGE_DIR'] = os.environ.get('IMAGE_DIR', os.path.join(app.instance_path, 'media'))
+    app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+
+    # Cola de trabajos en segundo plano (export estático, imágenes). Con JOB_WORKERS=0 los trabajos
+    # solo se ejecutan con "flask jobs work" en un proceso aparte
+    app.config['JOB_QUEUE_PATH'] = os.environ.get('JOB_QUEUE_PATH',
+                                                  os.path.join(app.instance_path, 'jobs.sqlite3'))
+    app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 1))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+
+    # Feeds y sitemap: URL pública del sitio (por defecto la del host de la petición) y de cada post
+    app.config['SITE_URL'] = os.environ.get('SITE_URL')
+    app.config['SITE_TITLE'] = os.environ.get('SITE_TITLE', 'Penumbra')
+    app.config['SITE_DESCRIPTION'] = os.environ.get('SITE_DESCRIPTION', 'Últimos artículos de Penumbra')
+    app.config['POST_URL_TEMPLATE'] = os.environ.get('POST_URL_TEMPLATE', '{site}/posts/{slug}')
+    app.config['FEED_ITEMS'] = int(os.environ.get('FEED_ITEMS', 20))
+    app.config['FEED_FULL_CONTENT'] = os.environ.get('FEED_FULL_CONTENT', 'false').lower() in \
+        ('1', 'true', 'yes')
+
+    # Compresión gzip/brotli de las respuestas dinámicas mayores a COMPRESS_MIN_SIZE bytes
+    app.config['COMPRESS_ENABLED'] = os.environ.get('COMPRESS_ENABLED', 'true').lower() in \
+        ('1', 'true', 'yes')
+    app.config['COMPRESS_MIN_SIZE'] = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+
+    # Archivos estáticos con hash y precomprimidos por "flask build-assets", servidos desde /assets
+    app.config['ASSETS_DIR'] = os.environ.get('ASSETS_DIR', os.path.join(app.instance_path, 'assets'))
+
+    # Registros por transacción en la importación masiva (flask bulk import, /api/admin/bulk)
+    app.config['BULK_CHUNK_SIZE'] = int(os.environ.get('BULK_CHUNK_SIZE', 1000))
+
+    # Consultas SQL más lentas que este umbral se registran con sus parámetros
+    app.config['SLOW_QUERY_THRESHOLD_MS'] = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200))
+
+    if config:
+        app.config.update(config)
+        if 'SQLALCHEMY_DATABASE_URI' in config and 'SQLALCHEMY_ENGINE_OPTIONS' not in config:
+            app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+    db.init_app(app)
+    replicas.init_app(app)
+    api_cache.init_app(app)
+    metrics.init_app(app)
+    images.init_app(app)
+    jobs.init_app(app)
+    compressor.init_app(app)
+    assets.init_app(app)
+
+    Migrate(app, db)
+
+    # Aquí se registran las rutas y los comandos de la CLI
+    endpoints.init_app(app)
+    commands.init_app(app)
+
+    return app
+
+
+# Trabajo que conviene hacer una sola vez en el proceso maestro de gunicorn (--preload): los workers
+# heredan por fork los templates compilados y los mappers ya configurados en lugar de repetirlo cada uno
+def warm_up(app):
+    configure_mappers()
+    for name in app.jinja_env.list_templates(extensions=('html',)):
+        app.jinja_env.get_template(name)
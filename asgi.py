@@ -0,0 +1,7 @@
+from routes.async_api import AsyncApi
+
+# API pública de lectura en modo asíncrono (requiere aiomysql, o aiosqlite para un SQLite local):
+#   uvicorn asgi:app --workers 2 --port 8001
+# nginx puede enviar /api/* acá y dejar el resto de la app en gunicorn con wsgi.py.
+# Las variables de entorno se cargan desde .env en database/config.py
+app = AsyncApi()
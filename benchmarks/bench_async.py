@@ -0,0 +1,111 @@
+"""Throughput de la API pública: workers síncronos de gunicorn contra la app ASGI (asgi.py) en uvicorn.
+
+    python -m benchmarks.load seed --db /tmp/penumbra-bench.db
+    python -m benchmarks.bench_async --db /tmp/penumbra-bench.db --workers 2 --concurrency 64
+
+Ambos servidores corren con la misma cantidad de procesos y se reporta la memoria total de cada uno.
+Con --database-url se puede medir contra MySQL, donde la espera de red es la que el modo asíncrono solapa.
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from benchmarks.load import (HttpClient, ROOT, _children, _free_port, database_url, peak_rss_kb,
+                             percentile)
+
+
+def paths(posts):
+    rng = random.Random(11)
+    choices = [
+        lambda: "/api/posts?fields=id,title,excerpt,date",
+        lambda: f"/api/posts/slug/post-{rng.randrange(posts)}",
+        lambda: f"/api/posts/{rng.randrange(1, posts + 1)}",
+        lambda: "/api/journals",
+    ]
+    return lambda: rng.choice(choices)()
+
+
+def start_server(kind, args, env):
+    port = _free_port()
+    if kind == "sync":
+        command = [sys.executable, "-m", "gunicorn", "--workers", str(args.workers),
+                   "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "wsgi:application"]
+        probe = "/health/db"
+    else:
+        command = [sys.executable, "-m", "uvicorn", "asgi:app", "--workers", str(args.workers),
+                   "--port", str(port), "--log-level", "warning", "--no-access-log"]
+        probe = "/api/journals?limit=1"
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if HttpClient(port).request("GET", probe)[0] == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit(f"{kind}: el servidor no respondió a tiempo")
+
+
+def drive(port, next_path, total, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker(count):
+        client = HttpClient(port)
+        local = []
+        for _ in range(count):
+            path = next_path()
+            start = time.perf_counter()
+            status, _ = client.request("GET", path)
+            local.append(time.perf_counter() - start)
+            if status != 200:
+                with lock:
+                    errors.append(status)
+        with lock:
+            latencies.extend(local)
+
+    per_thread = [total // concurrency + (1 if n < total % concurrency else 0) for n in range(concurrency)]
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread if count]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="penumbra-bench.db", help="SQLite sembrado con benchmarks.load seed")
+    parser.add_argument("--database-url", help="otra base (p. ej. MySQL) en lugar de --db")
+    parser.add_argument("--posts", type=int, default=20_000, help="posts sembrados, para elegir slugs")
+    parser.add_argument("--workers", type=int, default=2, help="procesos de cada servidor")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--servers", default="sync,async")
+    args = parser.parse_args()
+
+    # Sin caché de respuestas: se compara el costo de ir a la base, no el de la caché
+    env = dict(os.environ, DATABASE_URL=args.database_url or database_url(args.db), API_CACHE_ENABLED="false")
+    for kind in args.servers.split(","):
+        process, port = start_server(kind, args, env)
+        try:
+            drive(port, paths(args.posts), min(args.requests, 200), args.concurrency)
+            latencies, errors, elapsed = drive(port, paths(args.posts), args.requests, args.concurrency)
+            rss = sum(peak_rss_kb([pid]) for pid in [process.pid] + _children(process.pid))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"{kind:6} {args.workers} workers  {len(latencies) / elapsed:8.1f} req/s  "
+              f"p50 {percentile(latencies, 0.50) * 1000:7.2f} ms  "
+              f"p99 {percentile(latencies, 0.99) * 1000:7.2f} ms  "
+              f"errores {len(errors)}  RSS total {rss / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
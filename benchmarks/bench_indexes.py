@@ -0,0 +1,104 @@
+"""Compara planes de consulta y tiempos antes y después de crear los índices de los modelos.
+
+    python -m benchmarks.bench_indexes --rows 100000
+    python -m benchmarks.bench_indexes --url "mysql+pymysql://user@host/db_de_prueba"
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from database.db import db
+from database.models import Post, Journal
+from benchmarks.seed import seed
+
+QUERIES = {
+    "keyset primera página": (
+        "SELECT id, title, date FROM post ORDER BY date DESC, id DESC LIMIT 20", {}),
+    "keyset página profunda": (
+        "SELECT id, title, date FROM post WHERE date <= :date AND (date < :date OR id < :id) "
+        "ORDER BY date DESC, id DESC LIMIT 20", {"date": "2016-06-01 00:00:00", "id": 10_000}),
+    "listado por categoría": (
+        "SELECT id, title, date FROM post WHERE category = :category ORDER BY date DESC LIMIT 20",
+        {"category": "cine"}),
+    "listado por autor": (
+        "SELECT id, title, date FROM post WHERE author = :author ORDER BY date DESC LIMIT 20",
+        {"author": "Autor 7"}),
+    "post por slug": (
+        "SELECT id, title FROM post WHERE slug = :slug", {"slug": "post-5000"}),
+    "journal por año y número": (
+        "SELECT id, title FROM journal WHERE year = :year AND number = :number", {"year": 2020, "number": 3}),
+    "journals recientes": (
+        "SELECT id, title, date FROM journal ORDER BY date DESC, id DESC LIMIT 20", {}),
+}
+
+MODEL_INDEXES = [index for model in (Post, Journal) for index in model.__table__.indexes]
+
+
+def explain(connection, sql, params):
+    if connection.dialect.name == "sqlite":
+        rows = connection.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params).all()
+        return "; ".join(row[-1] for row in rows)
+    rows = connection.execute(text(f"EXPLAIN {sql}"), params).mappings().all()
+    return "; ".join(f"{row['table']}: key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+                     for row in rows)
+
+
+def timing(connection, sql, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection.execute(text(sql), params).all()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def report(connection, label, repeat):
+    print(f"\n== {label} ==")
+    results = {}
+    for name, (sql, params) in QUERIES.items():
+        results[name] = timing(connection, sql, params, repeat)
+        print(f"{name:28} {results[name]:9.3f} ms  | {explain(connection, sql, params)}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="URL de SQLAlchemy (por defecto un SQLite temporal)")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_indexes.db')}"
+    engine = create_engine(url)
+    tables = [Post.__table__, Journal.__table__]
+
+    db.metadata.drop_all(engine, tables=tables)
+    db.metadata.create_all(engine, tables=tables)
+    with engine.begin() as connection:
+        for index in MODEL_INDEXES:
+            index.drop(connection)
+        start = time.perf_counter()
+        seed(connection, posts=args.rows, journals=max(args.rows // 50, 1), content_words=60)
+        print(f"Sembradas {args.rows} filas en {time.perf_counter() - start:.1f} s ({url})")
+
+    with engine.connect() as connection:
+        before = report(connection, "sin índices", args.repeat)
+
+    with engine.begin() as connection:
+        for index in MODEL_INDEXES:
+            index.create(connection)
+        if connection.dialect.name == "sqlite":
+            connection.execute(text("ANALYZE"))
+
+    with engine.connect() as connection:
+        after = report(connection, "con índices", args.repeat)
+
+    print("\n== mejora ==")
+    for name in QUERIES:
+        print(f"{name:28} x{before[name] / max(after[name], 1e-6):8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Somete la app a peticiones concurrentes contra un SQLite local y verifica el comportamiento del pool.
+
+    python -m benchmarks.bench_pool --threads 16 --requests 200 --pool-size 4 --overflow 2
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="peticiones por thread")
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--overflow", type=int, default=2)
+    parser.add_argument("--posts", type=int, default=2_000)
+    args = parser.parse_args()
+
+    # La configuración se lee al importar la app, así que se define antes
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_pool.db')}"
+    os.environ["DB_POOL_SIZE"] = str(args.pool_size)
+    os.environ["DB_MAX_OVERFLOW"] = str(args.overflow)
+
+    from app import create_app
+    from database.db import db
+    from helpers.cache import api_cache
+    from benchmarks.seed import seed
+
+    app = create_app()
+    api_cache.enabled = False
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            seed(connection, posts=args.posts, journals=50, content_words=40)
+
+    errors = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def worker():
+        client = app.test_client()
+        for n in range(args.requests):
+            url = ("/api/posts?fields=id,title", "/api/posts/slug/post-7", "/api/journals", "/")[n % 4]
+            try:
+                status = client.get(url).status_code
+            except Exception as e:
+                with lock:
+                    errors.append(repr(e))
+                continue
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.threads * args.requests
+    print(f"{total} peticiones en {elapsed:.2f} s ({total / elapsed:,.0f} req/s), estados: {statuses}")
+    with app.test_client() as client:
+        health = client.get("/health/db").get_json()
+    print(f"pool: {health['pool']}")
+
+    pool = health["pool"]
+    problems = []
+    if errors:
+        problems.append(f"{len(errors)} errores, p. ej. {errors[0]}")
+    if pool.get("timeouts"):
+        problems.append(f"{pool['timeouts']} timeouts esperando conexión")
+    if pool.get("checked_out", 0) > 1:
+        problems.append(f"{pool['checked_out']} conexiones sin devolver al pool")
+    if pool.get("size", 0) + pool.get("overflow", 0) > args.pool_size + args.overflow:
+        problems.append("el pool superó su tamaño máximo")
+    if set(statuses) - {200}:
+        problems.append(f"respuestas inesperadas: {statuses}")
+
+    print("OK" if not problems else "FALLÓ:\n  " + "\n  ".join(problems))
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
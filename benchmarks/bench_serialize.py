@@ -0,0 +1,80 @@
+"""Compara el camino de serialización anterior (instancias ORM + serialize() + jsonify) con el nuevo
+(tuplas de columnas + codificador rápido) para un listado de posts.
+
+    python -m benchmarks.bench_serialize --rows 10000
+"""
+import argparse
+import time
+from flask import Flask, jsonify
+from database.db import db
+from database.models import Post
+from helpers import serialization
+from helpers.serialization import columns_for, rows_to_dicts
+from benchmarks.seed import seed
+
+
+# Copia de Post.serialize() tal como estaba antes del cambio: todas las columnas, sin "excerpt"
+def baseline_serialize(post):
+    return {
+        "id": post.id,
+        "author": post.author,
+        "date": post.date.isoformat(),
+        "category": post.category,
+        "slug": post.slug,
+        "image": post.image,
+        "title": post.title,
+        "content": post.content
+    }
+
+
+# Lo que hacía get_posts(): Post.query.all() y jsonify sobre la lista de diccionarios
+def old_path():
+    posts = Post.query.all()
+    return jsonify([baseline_serialize(post) for post in posts]).get_data()
+
+
+def new_path(dumps):
+    rows = db.session.execute(db.select(*columns_for(Post, Post.api_fields))).all()
+    return dumps(rows_to_dicts(Post.api_fields, rows))
+
+
+def measure(label, function, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        body = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:34} {best * 1000:9.1f} ms  {rows / best:12,.0f} filas/s  "
+          f"{len(body) / best / 2 ** 20:8.1f} MiB/s  ({len(body) / 2 ** 20:.1f} MiB)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite://"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            seed(connection, posts=args.rows, journals=0)
+
+        print(f"{args.rows} posts, mejor de {args.repeat} corridas")
+        old = measure("ORM + serialize() + jsonify", old_path, args.rows, args.repeat)
+        new = measure("tuplas + json estándar", lambda: new_path(serialization._stdlib_dumps),
+                      args.rows, args.repeat)
+        if serialization.orjson is not None:
+            new = measure("tuplas + orjson", lambda: new_path(serialization._orjson_dumps),
+                          args.rows, args.repeat)
+        print(f"\nmejora: x{old / new:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Arranque de la app: importación, create_app() y primera petición por worker, con y sin precarga.
+
+    python -m benchmarks.load seed --db /tmp/penumbra-bench.db
+    python -m benchmarks.bench_startup --db /tmp/penumbra-bench.db --runs 5 --workers 4
+
+La primera parte corre cada medición en un proceso nuevo (como un worker recién creado) y compara la
+primera petición con y sin warm_up(). La segunda levanta gunicorn con y sin preload_app y mide cuánto
+tarda en responder, la latencia de la primera ronda de peticiones y la memoria proporcional (PSS) total,
+que sí refleja las páginas compartidas por fork.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from benchmarks.load import HttpClient, ROOT, _children, _free_port, database_url
+
+FIRST_PATHS = ("/login", "/api/journals?limit=1")
+
+
+# Corre dentro del proceso hijo: cada paso se mide desde un intérprete limpio
+def child(warm):
+    start = time.perf_counter()
+    from app import create_app, warm_up
+    timings = {"import": time.perf_counter() - start}
+
+    start = time.perf_counter()
+    app = create_app()
+    timings["create_app"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if warm:
+        warm_up(app)
+    timings["warm_up"] = time.perf_counter() - start
+
+    client = app.test_client()
+    for label in ("first", "second"):
+        for path in FIRST_PATHS:
+            start = time.perf_counter()
+            status = client.get(path).status_code
+            timings[f"{label} {path}"] = time.perf_counter() - start
+            if status != 200:
+                raise SystemExit(f"{path}: {status}")
+    print(json.dumps(timings))
+
+
+def in_process(args, env):
+    for warm in (False, True):
+        runs = []
+        for _ in range(args.runs):
+            command = [sys.executable, "-m", "benchmarks.bench_startup", "--child"]
+            output = subprocess.run(command + (["--warm"] if warm else []), cwd=ROOT, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            runs.append(json.loads(output.splitlines()[-1]))
+        print(f"\n{'con' if warm else 'sin'} warm_up (mediana de {args.runs} procesos)")
+        for name in runs[0]:
+            print(f"  {name:32} {statistics.median(run[name] for run in runs) * 1000:8.1f} ms")
+
+
+def pss_kb(pids):
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def with_gunicorn(args, env):
+    for preload in (False, True):
+        port = _free_port()
+        command = [sys.executable, "-m", "gunicorn", "--workers", str(args.workers), "--threads", "1",
+                   "--bind", f"127.0.0.1:{port}", "--log-level", "warning"]
+        start = time.perf_counter()
+        process = subprocess.Popen(command, cwd=ROOT, env=dict(env, GUNICORN_PRELOAD=str(preload).lower()))
+        try:
+            ready = None
+            deadline = time.monotonic() + 60
+            while ready is None and time.monotonic() < deadline:
+                try:
+                    if HttpClient(port).request("GET", "/health/db")[0] == 200:
+                        ready = time.perf_counter() - start
+                except OSError:
+                    time.sleep(0.05)
+            if ready is None:
+                raise SystemExit("gunicorn no respondió a tiempo")
+
+            # Una conexión nueva por petición y todas a la vez, para que cada worker atienda alguna
+            latencies = []
+            lock = threading.Lock()
+
+            def hit(path):
+                begin = time.perf_counter()
+                HttpClient(port).request("GET", path)
+                with lock:
+                    latencies.append(time.perf_counter() - begin)
+
+            threads = [threading.Thread(target=hit, args=(FIRST_PATHS[n % len(FIRST_PATHS)],))
+                       for n in range(args.workers * 2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            pss = pss_kb([process.pid] + _children(process.pid))
+        finally:
+            process.terminate()
+            process.wait()
+        print(f"gunicorn {args.workers} workers {'con' if preload else 'sin'} preload:  "
+              f"listo en {ready * 1000:7.1f} ms  primera ronda p50 "
+              f"{statistics.median(latencies) * 1000:6.1f} ms / máx {max(latencies) * 1000:6.1f} ms  "
+              f"PSS total {pss / 1024:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default="penumbra-bench.db", help="SQLite sembrado con benchmarks.load seed")
+    parser.add_argument("--database-url", help="otra base (p. ej. MySQL) en lugar de --db")
+    parser.add_argument("--runs", type=int, default=5, help="procesos por variante")
+    parser.add_argument("--workers", type=int, default=4, help="workers de gunicorn")
+    parser.add_argument("--skip-gunicorn", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--warm", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.warm)
+
+    # Sin caché de respuestas ni threads de la cola de trabajos: solo el costo de arrancar
+    env = dict(os.environ, DATABASE_URL=args.database_url or database_url(args.db),
+               API_CACHE_ENABLED="false", JOB_WORKERS="0")
+    in_process(args, env)
+    if not args.skip_gunicorn:
+        print()
+        with_gunicorn(args, env)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Benchmark de carga reproducible de la app sobre un SQLite local con datos sembrados.
+
+    python -m benchmarks.load seed --db /tmp/penumbra-bench.db --posts 20000 --journals 500
+    python -m benchmarks.load run --db /tmp/penumbra-bench.db --driver client --output antes.json
+    python -m benchmarks.load run --db /tmp/penumbra-bench.db --driver gunicorn --workers 2 --output a.json
+    python -m benchmarks.load compare antes.json despues.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import re
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+ADMIN_NAME = "bench-admin"
+ADMIN_PASSWORD = "bench-password"
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def database_url(path):
+    return f"sqlite:///{os.path.abspath(path)}"
+
+
+def _app_env(args):
+    env = dict(os.environ, DATABASE_URL=database_url(args.db))
+    env["API_CACHE_ENABLED"] = "false" if args.no_cache else "true"
+    return env
+
+
+# ---------------------------------------------------------------------------- seed
+
+def seed_command(args):
+    os.environ.update(_app_env(args))
+    if os.path.exists(args.db):
+        os.remove(args.db)
+
+    from app import create_app
+    from database.db import db
+    from database.models import Admin, ContentVersion, FacetCount, Post
+    from benchmarks.seed import seed
+
+    app = create_app()
+    start = time.perf_counter()
+    with app.app_context():
+        db.create_all(bind_key=None)
+        with db.engine.begin() as connection:
+            seed(connection, posts=args.posts, journals=args.journals, content_words=args.words)
+        db.session.add(Admin(name=ADMIN_NAME, email="bench@example.com", password=ADMIN_PASSWORD))
+        for kind in FacetCount.kinds:
+            column = getattr(Post, kind)
+            for value, count in db.session.execute(db.select(column, db.func.count()).group_by(column)):
+                db.session.add(FacetCount(kind=kind, value=value, count=count))
+        for name in ("posts", "journals"):
+            ContentVersion.bump(name)
+        db.session.commit()
+    print(f"{args.db}: {args.posts} posts y {args.journals} journals en {time.perf_counter() - start:.1f} s")
+
+
+# ---------------------------------------------------------------------------- clientes
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        self.cookies = {}
+
+    def request(self, method, path, data=None):
+        headers = {"Cookie": "; ".join(f"{k}={v}" for k, v in self.cookies.items())}
+        body = None
+        if data is not None:
+            body = urlencode(data)
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        payload = response.read()
+        for header in response.headers.get_all("Set-Cookie") or []:
+            name, _, rest = header.partition("=")
+            self.cookies[name] = rest.split(";", 1)[0]
+        return response.status, payload
+
+
+def login(client):
+    _, page = client.request("GET", "/login")
+    token = re.search(rb'name="csrf_token" type="hidden" value="([^"]+)"', page)
+    data = {"name": ADMIN_NAME, "password": ADMIN_PASSWORD}
+    if token:
+        data["csrf_token"] = token.group(1).decode()
+    status, _ = client.request("POST", "/login", data)
+    return status
+
+
+# ---------------------------------------------------------------------------- escenarios
+
+def scenarios(posts, journals):
+    rng = random.Random(7)
+    start = datetime(2015, 1, 1)
+
+    # Las fechas sembradas por benchmarks/seed.py: saltar a un día al azar recorre todo el archivo
+    def post_day():
+        return (start + timedelta(minutes=rng.randrange(posts) * 53)).strftime("%Y-%m-%d")
+
+    def journal_day():
+        return (start + timedelta(days=rng.randrange(max(journals, 1)) * 3)).strftime("%Y-%m-%d")
+
+    return {
+        "api_list": (False, lambda: ("GET", "/api/posts?fields=id,title,excerpt,date")),
+        "api_list_full": (False, lambda: ("GET", "/api/posts")),
+        "slug_lookup": (False, lambda: ("GET", f"/api/posts/slug/post-{rng.randrange(posts)}")),
+        "home_page": (False, lambda: ("GET", "/")),
+        "admin_edit_posts": (True, lambda: ("GET", f"/admin/edit?date={post_day()}")),
+        "admin_erase_posts": (True, lambda: ("GET", f"/admin/erase?date={post_day()}")),
+        "admin_edit_journals": (True, lambda: ("GET", f"/admin/edit-journal?date={journal_day()}")),
+        "login": (False, None),
+    }
+
+
+def run_scenario(make_client, needs_login, next_request, total, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [total // concurrency + (1 if n < total % concurrency else 0) for n in range(concurrency)]
+
+    def worker(count):
+        client = make_client()
+        if needs_login:
+            login(client)
+        local = []
+        for _ in range(count):
+            start = time.perf_counter()
+            if next_request is None:
+                status = login(make_client())
+                ok = status in (200, 302)
+            else:
+                method, path = next_request()
+                status, _ = client.request(method, path)
+                ok = status in (200, 304)
+            local.append(time.perf_counter() - start)
+            if not ok:
+                with lock:
+                    errors.append(status)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_thread if count]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def peak_rss_kb(pids):
+    peak = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        peak = max(peak, int(line.split()[1]))
+        except FileNotFoundError:
+            continue
+    return peak
+
+
+def _children(pid):
+    children = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as stat:
+                    if int(stat.read().rsplit(")", 1)[1].split()[1]) == pid:
+                        children.append(int(entry))
+            except (FileNotFoundError, IndexError, ValueError):
+                continue
+    return children
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_gunicorn(args):
+    port = _free_port()
+    command = [sys.executable, "-m", "gunicorn",
+               "--workers", str(args.workers), "--threads", str(args.threads),
+               "--bind", f"127.0.0.1:{port}", "--log-level", "warning", "wsgi:application"]
+    process = subprocess.Popen(command, cwd=ROOT, env=_app_env(args))
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if HttpClient(port).request("GET", "/health/db")[0] == 200:
+                return process, port
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("gunicorn no respondió a tiempo")
+
+
+def run_command(args):
+    os.environ.update(_app_env(args))
+    from app import create_app
+    from database.db import db
+    from database.models import Journal, Post
+
+    app = create_app()
+    process = None
+    if args.driver == "gunicorn":
+        process, port = start_gunicorn(args)
+
+        def make_client():
+            return HttpClient(port)
+    else:
+        def make_client():
+            return InProcessClient(app)
+
+    with app.app_context():
+        posts = db.session.scalar(db.select(db.func.count(Post.id)))
+        journals = db.session.scalar(db.select(db.func.count(Journal.id)))
+
+    selected = scenarios(posts, journals)
+    names = args.scenarios.split(",") if args.scenarios else list(selected)
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "commit": subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                 capture_output=True, text=True).stdout.strip(),
+        "driver": args.driver,
+        "posts": posts,
+        "journals": journals,
+        "concurrency": args.concurrency,
+        "scenarios": {},
+    }
+
+    try:
+        for name in names:
+            needs_login, next_request = selected[name]
+            total = args.requests if next_request else max(args.requests // 10, 1)
+            if args.warmup:
+                run_scenario(make_client, needs_login, next_request, min(args.warmup, total), 1)
+            latencies, errors, elapsed = run_scenario(make_client, needs_login, next_request,
+                                                      total, args.concurrency)
+            result = {
+                "requests": len(latencies),
+                "errors": len(errors),
+                "throughput_rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            }
+            report["scenarios"][name] = result
+            print(f"{name:22} {result['throughput_rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+                  f"p95 {result['p95_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                  f"errores {result['errors']}")
+    finally:
+        if process is not None:
+            report["peak_rss_kb"] = peak_rss_kb([process.pid] + _children(process.pid))
+            process.terminate()
+            process.wait()
+        else:
+            report["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"RSS máximo: {report['peak_rss_kb'] / 1024:.1f} MiB")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+
+# ---------------------------------------------------------------------------- compare
+
+def compare_command(args):
+    with open(args.before) as before_file, open(args.after) as after_file:
+        before, after = json.load(before_file), json.load(after_file)
+    print(f"{before.get('commit')} -> {after.get('commit')}")
+    for name, old in before["scenarios"].items():
+        new = after["scenarios"].get(name)
+        if not new:
+            continue
+        cells = []
+        for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+            change = (new[metric] - old[metric]) / old[metric] * 100 if old[metric] else 0.0
+            cells.append(f"{metric} {old[metric]:>9} -> {new[metric]:>9} ({change:+6.1f}%)")
+        print(f"{name:22} " + "  ".join(cells))
+    print(f"peak_rss_kb {before.get('peak_rss_kb')} -> {after.get('peak_rss_kb')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="crea y siembra la base SQLite")
+    seed_parser.add_argument("--db", default="penumbra-bench.db")
+    seed_parser.add_argument("--posts", type=int, default=20_000)
+    seed_parser.add_argument("--journals", type=int, default=500)
+    seed_parser.add_argument("--words", type=int, default=300, help="palabras por post")
+    seed_parser.add_argument("--no-cache", action="store_true")
+    seed_parser.set_defaults(handler=seed_command)
+
+    run_parser = commands.add_parser("run", help="corre los escenarios y genera el reporte")
+    run_parser.add_argument("--db", default="penumbra-bench.db")
+    run_parser.add_argument("--driver", choices=("client", "gunicorn"), default="client")
+    run_parser.add_argument("--requests", type=int, default=500, help="peticiones por escenario")
+    run_parser.add_argument("--concurrency", type=int, default=4)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--workers", type=int, default=2, help="workers de gunicorn")
+    run_parser.add_argument("--threads", type=int, default=4, help="threads por worker de gunicorn")
+    run_parser.add_argument("--scenarios", help="lista separada por comas (por defecto todos)")
+    run_parser.add_argument("--no-cache", action="store_true", help="desactiva la caché de respuestas")
+    run_parser.add_argument("--output", help="archivo JSON para comparar entre commits")
+    run_parser.set_defaults(handler=run_command)
+
+    compare_parser = commands.add_parser("compare", help="compara dos reportes JSON")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.set_defaults(handler=compare_command)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
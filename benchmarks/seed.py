@@ -0,0 +1,49 @@
+import random
+from datetime import datetime, timedelta
+from database.models import Post, Journal, make_excerpt
+
+CATEGORIES = ["cine", "literatura", "música", "filosofía", "arte", "historia", "ciencia", "opinión"]
+AUTHORS = [f"Autor {n}" for n in range(1, 41)]
+WORDS = ("la sombra de una ciudad que no duerme nunca cuando el cine y la literatura se cruzan "
+         "en la penumbra de las salas vacías donde alguien escribe sobre lo que no se ve").split()
+BATCH_SIZE = 5000
+
+
+def _paragraphs(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+# Inserta filas sintéticas con executemany por lotes; determinista para poder comparar corridas
+def seed(connection, posts=100_000, journals=2_000, content_words=300, seed_value=42):
+    rng = random.Random(seed_value)
+    start = datetime(2015, 1, 1)
+
+    rows = []
+    for n in range(posts):
+        content = _paragraphs(rng, content_words)
+        rows.append({
+            "author": rng.choice(AUTHORS),
+            "date": start + timedelta(minutes=n * 53 + rng.randint(0, 40)),
+            "category": rng.choice(CATEGORIES),
+            "slug": f"post-{n}",
+            "image": f"https://images.example.com/{n}.jpg",
+            "title": f"Post número {n}: {_paragraphs(rng, 6)}",
+            "content": content,
+            "excerpt": make_excerpt(content),
+        })
+        if len(rows) == BATCH_SIZE:
+            connection.execute(Post.__table__.insert(), rows)
+            rows = []
+    if rows:
+        connection.execute(Post.__table__.insert(), rows)
+
+    rows = [{
+        "date": start + timedelta(days=n * 3),
+        "number": n % 12 + 1,
+        "year": 2015 + n // 12,
+        "title": f"Revista {n}",
+        "url": f"https://penumbra.example.com/revistas/{n}.pdf",
+        "image": f"https://images.example.com/revista-{n}.jpg",
+    } for n in range(journals)]
+    if rows:
+        connection.execute(Journal.__table__.insert(), rows)
@@ -1,14 +1,88 @@
 from dotenv import load_dotenv
 import os
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .pool import InstrumentedQueuePool
 
 load_dotenv()
 
-user = os.environ['MYSQL_USER']
-password = os.environ['MYSQL_PASSWORD']
-host = os.environ['MYSQL_HOST']
-database = os.environ['MYSQL_DATABASE']
+# DATABASE_URL permite apuntar a otra base, p. ej. un SQLite local para pruebas y benchmarks
+if os.environ.get('DATABASE_URL'):
+    DATABASE_CONNECTION_URI = os.environ['DATABASE_URL']
+else:
+    user = os.environ['MYSQL_USER']
+    password = os.environ['MYSQL_PASSWORD']
+    host = os.environ['MYSQL_HOST']
+    database = os.environ['MYSQL_DATABASE']
 
-# DATABASE_CONNECTION_URI = f'mysql+pymysql://{user}:{password}@{host}/{database}'
+    # DATABASE_CONNECTION_URI = f'mysql+pymysql://{user}:{password}@{host}/{database}'
 
-# This connection string is just for testing inside local dev setup
-DATABASE_CONNECTION_URI = f'mysql+pymysql://{user}@{host}/{database}'
+    # This connection string is just for testing inside local dev setup
+    DATABASE_CONNECTION_URI = f'mysql+pymysql://{user}@{host}/{database}'
+
+
+def _env_bool(name, default):
+    return os.environ.get(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+# Opciones del pool de conexiones. DB_POOL_SIZE debería igualar los threads por worker de gunicorn:
+# cada worker tiene su propio pool, así que el total de conexiones es workers * (size + overflow).
+# DB_POOL_RECYCLE tiene que ser menor que el wait_timeout de MySQL para evitar "server has gone away"
+def engine_options(uri):
+    if uri.startswith('sqlite') and (uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri):
+        return {}
+
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 5)),
+        'pool_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 280)),
+        'pool_pre_ping': _env_bool('DB_POOL_PRE_PING', True),
+    }
+    if uri.startswith('mysql'):
+        options['connect_args'] = {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+            'read_timeout': int(os.environ.get('DB_READ_TIMEOUT', 30)),
+            'write_timeout': int(os.environ.get('DB_WRITE_TIMEOUT', 30)),
+        }
+    return options
+
+
+DATABASE_ENGINE_OPTIONS = engine_options(DATABASE_CONNECTION_URI)
+
+
+# Réplicas de solo lectura opcionales, separadas por comas; se registran como binds "replica_N"
+DATABASE_REPLICA_URIS = [
+    uri.strip() for uri in os.environ.get('DATABASE_REPLICA_URIS', '').split(',') if uri.strip()
+]
+
+DATABASE_BINDS = {
+    f'replica_{n}': {'url': uri, **engine_options(uri)} for n, uri in enumerate(DATABASE_REPLICA_URIS)
+}
+
+
+# Modo asíncrono (asgi.py): la misma base con un driver asyncio. El pool instrumentado es
+# síncrono, así que el motor asíncrono usa AsyncAdaptedQueuePool con los mismos tamaños
+ASYNC_DRIVERS = {
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+}
+
+
+def async_uri(uri):
+    scheme, separator, rest = uri.partition('://')
+    return ASYNC_DRIVERS.get(scheme, scheme) + separator + rest
+
+
+def async_engine_options(uri):
+    options = engine_options(uri)
+    if 'poolclass' in options:
+        options['poolclass'] = AsyncAdaptedQueuePool
+    if 'connect_args' in options:
+        options['connect_args'] = {'connect_timeout': options['connect_args']['connect_timeout']}
+    return options
+
+
+ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URL') or async_uri(DATABASE_CONNECTION_URI)
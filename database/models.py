@@ -1,7 +1,23 @@
 from datetime import datetime, timezone
 from flask_login import UserMixin
+from sqlalchemy.orm import validates
 from .db import db
 
+EXCERPT_LENGTH = 250
+
+
+# Solo se accede a los campos pedidos, así las columnas no cargadas (load_only) no disparan consultas extra
+def _serialize_fields(instance, fields):
+    data = {}
+    for field in fields:
+        value = getattr(instance, field)
+        data[field] = value.isoformat() if isinstance(value, datetime) else value
+    return data
+
+
+def make_excerpt(content):
+    return content[:EXCERPT_LENGTH] if content else content
+
 
 class Admin(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
@@ -20,32 +36,54 @@ class Admin(db.Model, UserMixin):
 
 
 class Post(db.Model):
+    # Índices alineados con las consultas reales: paginación por (date, id) y listados por categoría/autor
+    __table_args__ = (
+        db.Index("ix_post_date_id", "date", "id"),
+        db.Index("ix_post_category_date", "category", "date"),
+        db.Index("ix_post_author_date", "author", "date"),
+        db.Index("ix_post_fulltext", "title", "content", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     author = db.Column(db.String(100), nullable=False)
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     category = db.Column(db.String(100), nullable=False)
     slug = db.Column(db.String(100), nullable=False, unique=True)
     image = db.Column(db.String(250))
+    # Variantes redimensionadas de "image" generadas por helpers/images.py:
+    # {"source": url, "webp": [[ancho, archivo], ...], "jpeg": [...]}
+    image_variants = db.Column(db.JSON)
     title = db.Column(db.String(250), nullable=False)
     content = db.Column(db.Text, nullable=False)
+    # Resumen precalculado para los listados, así no hace falta cargar "content"
+    excerpt = db.Column(db.String(EXCERPT_LENGTH))
+    # Última modificación: <lastmod> del sitemap, <updated> de Atom y fragmentos cacheados de los feeds
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc),
+                           onupdate=lambda: datetime.now(timezone.utc))
+
+    api_fields = ("id", "author", "date", "category", "slug", "image", "title", "content", "excerpt")
 
     def __repr__(self):
         return "<Post %r>" % self.id
 
-    def serialize(self):
-        return {
-            "id": self.id,
-            "author": self.author,
-            "date": self.date.isoformat(),
-            "category": self.category,
-            "slug": self.slug,
-            "image": self.image,
-            "title": self.title,
-            "content": self.content
-        }
+    @validates("content")
+    def _update_excerpt(self, key, content):
+        self.excerpt = make_excerpt(content)
+        return content
+
+    def facets(self):
+        return {kind: getattr(self, kind) for kind in FacetCount.kinds}
+
+    def serialize(self, fields=api_fields):
+        return _serialize_fields(self, fields)
 
 
 class Journal(db.Model):
+    __table_args__ = (
+        db.Index("ix_journal_date_id", "date", "id"),
+        db.Index("ix_journal_year_number", "year", "number"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
     number = db.Column(db.Integer, nullable=False)
@@ -53,17 +91,84 @@ class Journal(db.Model):
     title = db.Column(db.String(250), nullable=False)
     url = db.Column(db.String(250), nullable=False)
     image = db.Column(db.String(250), nullable=True)
+    image_variants = db.Column(db.JSON)
+
+    api_fields = ("id", "date", "number", "year", "title", "url", "image")
 
     def __repr__(self):
         return "<Journal %r>" % self.id
 
+    def serialize(self, fields=api_fields):
+        return _serialize_fields(self, fields)
+
+
+# Versión de cada tipo de contenido ("posts", "journals"); las rutas de escritura la incrementan
+# dentro de la misma transacción y las lecturas la usan para ETag / Last-Modified
+class ContentVersion(db.Model):
+    __tablename__ = "content_version"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return "<ContentVersion %r>" % self.name
+
+    @classmethod
+    def bump(cls, name):
+        now = datetime.now(timezone.utc)
+        result = db.session.execute(
+            db.update(cls).where(cls.name == name).values(version=cls.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            db.session.add(cls(name=name, version=1, updated_at=now))
+
+    @classmethod
+    def current(cls, name):
+        row = db.session.execute(db.select(cls.version, cls.updated_at).where(cls.name == name)).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+
+# Conteos materializados de posts por categoría y por autor; las rutas de escritura los ajustan
+# en la misma transacción para no hacer un GROUP BY sobre toda la tabla en cada petición
+class FacetCount(db.Model):
+    __tablename__ = "facet_count"
+
+    kinds = ("category", "author")
+
+    kind = db.Column(db.String(20), primary_key=True)
+    value = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return "<FacetCount %r:%r>" % (self.kind, self.value)
+
     def serialize(self):
-        return {
-            "id": self.id,
-            "date": self.date.isoformat(),
-            "number": self.number,
-            "year": self.year,
-            "title": self.title,
-            "url": self.url,
-            "image": self.image
-        }
+        return {"name": self.value, "count": self.count}
+
+    @classmethod
+    def adjust(cls, kind, value, delta):
+        result = db.session.execute(
+            db.update(cls).where(cls.kind == kind, cls.value == value).values(count=cls.count + delta)
+        )
+        if result.rowcount == 0 and delta > 0:
+            db.session.add(cls(kind=kind, value=value, count=delta))
+        elif delta < 0:
+            db.session.execute(db.delete(cls).where(cls.kind == kind, cls.value == value, cls.count <= 0))
+
+    # "before"/"after" son los valores de Post.facets() antes y después del cambio (None si no existe)
+    @classmethod
+    def update_post(cls, before=None, after=None):
+        for kind in cls.kinds:
+            old = before[kind] if before else None
+            new = after[kind] if after else None
+            if old == new:
+                continue
+            if old is not None:
+                cls.adjust(kind, old, -1)
+            if new is not None:
+                cls.adjust(kind, new, 1)
+
+    @classmethod
+    def listing(cls, kind):
+        return cls.query.filter_by(kind=kind).order_by(cls.count.desc(), cls.value).all()
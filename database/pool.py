@@ -0,0 +1,57 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+
+# QueuePool que mide cuánto espera cada petición por una conexión (incluye abrirla si hace falta)
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.invalidations = 0
+        event.listen(self, "invalidate", self._on_invalidate)
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._stats_lock:
+            self.invalidations += 1
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "size": self.size(),
+                "checked_in": self.checkedin(),
+                "checked_out": self.checkedout(),
+                "overflow": self.overflow(),
+                "checkouts": self.checkouts,
+                "wait_avg_ms": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+                "timeouts": self.timeouts,
+                "invalidations": self.invalidations,
+            }
+
+
+def pool_stats(engine):
+    pool = engine.pool
+    if isinstance(pool, InstrumentedQueuePool):
+        return pool.stats()
+    return {"status": pool.status()}
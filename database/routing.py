@@ -0,0 +1,88 @@
+import itertools
+import threading
+import time
+from functools import wraps
+from flask import Flask, current_app, g, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+
+REPLICA_PREFIX = "replica_"
+
+
+# Sesión que envía las consultas a la réplica elegida para la petición (g.db_replica);
+# mientras hace flush (escrituras) o si no hay réplica elegida, usa la base primaria
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("db_replica"):
+            return self._db.engines[g.db_replica]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    # Round-robin entre las réplicas sanas; una réplica que falla queda fuera durante "retry_after"
+    # segundos y después vuelve a probarse. Tras una escritura, la sesión del admin queda pegada
+    # a la primaria "sticky_seconds" para leer lo que acaba de escribir
+    def __init__(self, app: Flask = None):
+        self.names = []
+        self.retry_after = 30
+        self.sticky_seconds = 10
+        self._down_until = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        binds = app.config.get("SQLALCHEMY_BINDS") or {}
+        self.names = sorted(name for name in binds if name.startswith(REPLICA_PREFIX))
+        self.retry_after = app.config.get("REPLICA_RETRY_AFTER", 30)
+        self.sticky_seconds = app.config.get("REPLICA_STICKY_SECONDS", 10)
+        if not event.contains(RoutingSession, "after_commit", self._after_commit):
+            event.listen(RoutingSession, "after_commit", self._after_commit)
+
+    def _after_commit(self, db_session):
+        if self.names and has_request_context():
+            session["db_primary_until"] = time.time() + self.sticky_seconds
+
+    def is_healthy(self, name):
+        return self._down_until.get(name, 0) <= time.monotonic()
+
+    def mark_down(self, name):
+        with self._lock:
+            self._down_until[name] = time.monotonic() + self.retry_after
+        current_app.logger.warning("Replica %s unavailable, using primary for %ss", name, self.retry_after)
+
+    def pick(self):
+        healthy = [name for name in self.names if self.is_healthy(name)]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def sticky(self):
+        return session.get("db_primary_until", 0) > time.time()
+
+    def status(self):
+        return {name: "up" if self.is_healthy(name) else "down" for name in self.names}
+
+    # Decorador para vistas de solo lectura: las envía a una réplica y, si la réplica falla,
+    # repite la vista una vez contra la primaria
+    def read_only(self, view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            name = self.pick() if self.names and not self.sticky() else None
+            if name is None:
+                return view(*args, **kwargs)
+
+            g.db_replica = name
+            try:
+                return view(*args, **kwargs)
+            except OperationalError:
+                self.mark_down(name)
+                g.db_replica = None
+                current_app.extensions["sqlalchemy"].session.rollback()
+                return view(*args, **kwargs)
+        return wrapper
+
+
+replicas = ReplicaRouter()
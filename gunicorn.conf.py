@@ -0,0 +1,24 @@
+import os
+
+# gunicorn lee este archivo desde el directorio del proyecto: "gunicorn" alcanza para arrancar
+wsgi_app = "wsgi:application"
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", 2))
+# Cada thread usa una conexión del pool: conviene que coincida con DB_POOL_SIZE
+threads = int(os.environ.get("GUNICORN_THREADS", os.environ.get("DB_POOL_SIZE", 5)))
+
+# La app se importa una sola vez en el proceso maestro (módulos, mappers, templates compilados)
+# y los workers la heredan por fork, compartiendo esa memoria
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+
+# Las conexiones abiertas en el maestro no se pueden compartir entre procesos: cada worker descarta
+# las heredadas (sin cerrarlas, siguen siendo del maestro) y abre su propio pool
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from wsgi import application
+    from database.db import db
+    with application.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
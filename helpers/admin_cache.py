@@ -0,0 +1,60 @@
+import hashlib
+import hmac
+from flask import current_app, session
+from sqlalchemy.orm import make_transient_to_detached
+from database.db import db
+from database.models import Admin
+from helpers.cache import MemoryBackend
+
+# Lo que se guarda en caché: el hash de la contraseña no sale de la base, solo entra en el sello
+ADMIN_FIELDS = ("id", "name", "email")
+STAMP_FIELDS = ADMIN_FIELDS + ("password",)
+
+# Caché por worker de los admins autenticados, para que load_user no consulte la base en cada petición.
+# No hay invalidación entre workers: un admin modificado o borrado directamente en la base se sigue
+# aceptando hasta ADMIN_CACHE_TTL segundos, por eso el TTL es corto
+_admins = MemoryBackend(max_entries=128)
+
+
+# Sello de versión del admin: cambia si cambia cualquiera de sus datos. Se guarda en la sesión al
+# hacer login, así un worker solo usa su copia en caché si coincide con la versión de la sesión.
+# Es un HMAC con la secret_key porque la cookie de sesión es legible por el cliente
+def admin_stamp(admin):
+    message = "|".join(str(getattr(admin, field)) for field in STAMP_FIELDS)
+    return hmac.new(current_app.secret_key.encode(), message.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def _key(user_id, stamp):
+    return f"admin:{user_id}:{stamp}"
+
+
+def remember_login(admin):
+    session["admin_stamp"] = admin_stamp(admin)
+
+
+def forget_login(user_id):
+    stamp = session.pop("admin_stamp", None)
+    if user_id is not None:
+        _admins.delete(_key(user_id, stamp))
+
+
+def load_admin(user_id):
+    stamp = session.get("admin_stamp")
+    if stamp:
+        values = _admins.get(_key(user_id, stamp))
+        if values is not None:
+            admin = Admin(**values)
+            make_transient_to_detached(admin)
+            return admin
+
+    admin = db.session.get(Admin, int(user_id))
+    if admin is None:
+        return None
+    current = admin_stamp(admin)
+    if stamp and stamp != current:
+        # El admin cambió desde que se inició esta sesión
+        return None
+    session["admin_stamp"] = current
+    _admins.set(_key(user_id, current), {field: getattr(admin, field) for field in ADMIN_FIELDS},
+                current_app.config.get("ADMIN_CACHE_TTL", 30))
+    return admin
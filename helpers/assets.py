@@ -0,0 +1,110 @@
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+from flask import Flask, request, send_from_directory, url_for
+from helpers.compression import STATIC_LEVELS, available_encodings, compress, is_compressible
+
+ASSET_MAX_AGE = 31536000
+ASSET_PREFIX = "/assets/"
+MANIFEST_NAME = "manifest.json"
+ENCODING_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+
+def fingerprint(path, data):
+    name, extension = os.path.splitext(path)
+    return f"{name}.{hashlib.sha256(data).hexdigest()[:12]}{extension}"
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as tmp:
+        tmp.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, path)
+
+
+# Archivos de static/ y public/ con el hash del contenido en el nombre, precomprimidos con gzip
+# (y brotli si está instalado) por "flask build-assets". Como el nombre cambia con el contenido,
+# se sirven desde /assets con caché de un año; manifest.json traduce el nombre original al publicado.
+# Sin build (desarrollo) asset_url() cae en url_for() y los archivos salen de /static como siempre
+class AssetManifest:
+    def __init__(self, app: Flask = None):
+        self.directory = None
+        self.sources = {}
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.directory = app.config.setdefault("ASSETS_DIR", os.path.join(app.instance_path, "assets"))
+        self.sources = {"static": app.static_folder, "public": os.path.join(app.root_path, "public")}
+        app.add_url_rule(ASSET_PREFIX + "<path:name>", "assets", self.asset_view)
+        app.add_template_global(self.asset_url, "asset_url")
+        self.load()
+
+    # El manifest se lee al arrancar: después de un build hay que reiniciar los workers
+    def load(self):
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME)) as manifest_file:
+                self.manifest = json.load(manifest_file)
+        except FileNotFoundError:
+            self.manifest = {}
+
+    # Los archivos de builds anteriores se conservan: páginas cacheadas todavía pueden pedirlos
+    def build(self):
+        manifest = {}
+        for source, root in self.sources.items():
+            for directory, _, names in os.walk(root):
+                for name in sorted(names):
+                    if name.startswith("."):
+                        continue
+                    path = os.path.join(directory, name)
+                    relative = os.path.relpath(path, root).replace(os.sep, "/")
+                    with open(path, "rb") as asset_file:
+                        data = asset_file.read()
+                    published = f"{source}/{fingerprint(relative, data)}"
+                    target = os.path.join(self.directory, published)
+                    if not os.path.exists(target):
+                        _write(target, data)
+                    if is_compressible(mimetypes.guess_type(name)[0] or ""):
+                        for encoding in available_encodings():
+                            encoded = compress(data, encoding, STATIC_LEVELS[encoding])
+                            # Solo si ahorra algo; si no, se sirve el original
+                            if len(encoded) < len(data):
+                                _write(target + ENCODING_SUFFIXES[encoding], encoded)
+                    manifest[f"{source}/{relative}"] = published
+        _write(os.path.join(self.directory, MANIFEST_NAME),
+               json.dumps(manifest, indent=2, sort_keys=True).encode())
+        self.manifest = manifest
+        return manifest
+
+    # Compatible con url_for: asset_url('static', filename='styles/main.css')
+    def asset_url(self, endpoint, filename=None, **values):
+        published = self.manifest.get(f"{endpoint}/{filename}")
+        if published is None:
+            return url_for(endpoint, filename=filename, **values)
+        return url_for("assets", name=published, **values)
+
+    # Sirve la versión precomprimida que el cliente acepte; no hace falta brotli instalado para servir .br
+    def asset_view(self, name):
+        mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        response = None
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if request.accept_encodings.quality(encoding) and \
+                    os.path.isfile(os.path.join(self.directory, name + suffix)):
+                response = send_from_directory(self.directory, name + suffix, mimetype=mimetype,
+                                               max_age=ASSET_MAX_AGE)
+                response.headers["Content-Encoding"] = encoding
+                break
+        if response is None:
+            response = send_from_directory(self.directory, name, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+        response.vary.add("Accept-Encoding")
+        response.cache_control.immutable = True
+        response.cache_control.public = True
+        return response
+
+
+assets = AssetManifest()
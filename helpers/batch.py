@@ -0,0 +1,65 @@
+from sqlalchemy import or_, select
+from helpers.pagination import MAX_LIMIT
+
+MAX_KEYS = MAX_LIMIT
+
+
+class BatchError(ValueError):
+    pass
+
+
+# "ids=3,1,2" en el orden pedido y sin repetidos
+def parse_keys(value, convert=str):
+    keys = []
+    for raw in (value or "").split(","):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            key = convert(raw)
+        except ValueError:
+            raise BatchError(f"Invalid key: {raw}")
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+# Claves pedidas por columna, p. ej. {"id": [3, 1], "slug": ["hola"]} para ?ids=3,1&slugs=hola
+def parse_batch(args, columns):
+    keys = {column: parse_keys(args.get(f"{column}s"), int if column == "id" else str) for column in columns}
+    total = sum(len(values) for values in keys.values())
+    if not total:
+        raise BatchError(" or ".join(f"{column}s" for column in columns) + " is required")
+    if total > MAX_KEYS:
+        raise BatchError(f"At most {MAX_KEYS} keys per request")
+    return keys
+
+
+# Una sola consulta con IN para todas las claves. Las columnas clave van al final para poder
+# ordenar el resultado; zip(fields, row) las descarta al serializar
+def batch_statement(model, fields, keys):
+    names = list(fields) + [column for column in keys if column not in fields]
+    conditions = [getattr(model, column).in_(values) for column, values in keys.items() if values]
+    return names, select(*[getattr(model, name) for name in names]).where(or_(*conditions))
+
+
+# La collation de MySQL compara los slugs sin distinguir mayúsculas: el IN devuelve "Hola" para "hola",
+# así que el índice tiene que buscar igual
+def _normalize(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+# Items en el orden pedido (primero ids, luego slugs), sin repetir filas, y las claves que no existen
+def order_batch(fields, names, rows, keys):
+    records = [dict(zip(names, row)) for row in rows]
+    index = {column: {_normalize(record[column]): n for n, record in enumerate(records)} for column in keys}
+
+    items, seen, missing = [], set(), {}
+    for column, values in keys.items():
+        missing[f"{column}s"] = [value for value in values if _normalize(value) not in index[column]]
+        for value in values:
+            n = index[column].get(_normalize(value))
+            if n is not None and n not in seen:
+                seen.add(n)
+                items.append(dict(zip(fields, rows[n])))
+    return {"items": items, "missing": missing}
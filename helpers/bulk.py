@@ -0,0 +1,264 @@
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.datastructures import MultiDict
+from wtforms import Form
+from database.db import db
+from database.models import ContentVersion, FacetCount, Journal, Post, make_excerpt
+from helpers.forms import JournalForm, PostForm
+from helpers.serialization import columns_for, json_dumps, row_to_dict
+from helpers.snapshot import journal_changed, posts_rebuilt
+from helpers.streaming import STREAM_BATCH_SIZE
+
+BULK_KINDS = ("posts", "journals")
+BULK_MODES = ("insert", "upsert")
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+# Campos de cada línea NDJSON; el export escribe los mismos, así su salida se puede volver a importar.
+# "excerpt" se recalcula y las variantes de imagen se regeneran con "flask build-images"
+BULK_FIELDS = {
+    "posts": ("id", "author", "date", "category", "slug", "image", "title", "content"),
+    "journals": ("id", "date", "number", "year", "title", "url", "image"),
+}
+FORM_FIELDS = {
+    "posts": ("author", "title", "image", "content", "category", "slug"),
+    "journals": ("date", "number", "year", "title", "url", "image"),
+}
+
+
+class BulkError(ValueError):
+    pass
+
+
+def model_for(kind):
+    if kind not in BULK_KINDS:
+        raise BulkError(f"kind must be one of: {', '.join(BULK_KINDS)}")
+    return Post if kind == "posts" else Journal
+
+
+def _parse_date(value):
+    if value in (None, ""):
+        return None
+    if not isinstance(value, str):
+        raise ValueError("date must be an ISO 8601 string")
+    date = datetime.fromisoformat(value)
+    return date.astimezone(timezone.utc).replace(tzinfo=None) if date.tzinfo else date
+
+
+# Los mismos campos y validadores que el formulario del admin sobre un Form de WTForms simple:
+# sin CSRF, sin el botón ni el envoltorio de Flask-WTF, que en una importación masiva dominan el costo
+def _import_form(form_class, fields):
+    attrs = {name: getattr(form_class, name) for name in fields + ("image_file",)}
+    attrs.update({name: value for name, value in vars(form_class).items() if name.startswith("validate_")})
+    return type(f"{form_class.__name__}Import", (Form,), attrs)
+
+
+IMPORT_FORMS = {"posts": _import_form(PostForm, FORM_FIELDS["posts"]),
+                "journals": _import_form(JournalForm, FORM_FIELDS["journals"])}
+
+
+# Cada registro pasa por las mismas reglas que el formulario del admin.
+# La fecha se valida aparte para conservar los segundos que el formato del formulario descarta.
+# Devuelve (valores para la tabla, errores)
+def validate(kind, record):
+    try:
+        date = _parse_date(record.get("date"))
+    except ValueError as e:
+        return None, {"date": [str(e)]}
+    formdata = MultiDict({name: "" if record.get(name) is None else str(record[name])
+                          for name in FORM_FIELDS[kind]})
+    if kind == "journals" and date is not None:
+        formdata["date"] = date.strftime("%Y-%m-%dT%H:%M")
+    form = IMPORT_FORMS[kind](formdata=formdata)
+    if not form.validate():
+        return None, form.errors
+
+    values = {name: getattr(form, name).data for name in FORM_FIELDS[kind]}
+    values["image"] = values["image"] or None
+    if date is not None:
+        values["date"] = date
+    if kind == "journals" and record.get("id") is not None:
+        if not isinstance(record["id"], int) or record["id"] < 1:
+            return None, {"id": ["id must be a positive integer"]}
+        values["id"] = record["id"]
+    return values, None
+
+
+# executemany exige que todas las filas tengan las mismas columnas: se agrupan por conjunto de claves
+def _execute_grouped(statement, rows):
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        db.session.execute(statement, group)
+
+
+# Importa un stream NDJSON en transacciones de "chunk_size" registros: por lote, una consulta para
+# saber qué claves (slug de posts, id de journals) ya existen, un INSERT y un UPDATE con executemany,
+# los conteos de facetas agregados y un solo bump de versión. Las líneas inválidas se informan y saltean
+class BulkImporter:
+    def __init__(self, kind, mode="insert", chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False):
+        self.model = model_for(kind)
+        if mode not in BULK_MODES:
+            raise BulkError(f"mode must be one of: {', '.join(BULK_MODES)}")
+        if chunk_size < 1:
+            raise BulkError("chunk_size must be greater than 0")
+        self.kind = kind
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.seen = set()
+        self.years = set()
+        self.report = {"kind": kind, "mode": mode, "dry_run": dry_run, "received": 0,
+                       "inserted": 0, "updated": 0, "skipped": 0, "errors": []}
+
+    def error(self, line, errors):
+        self.report["skipped"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"line": line, "errors": errors})
+
+    def run(self, lines):
+        chunk = []
+        for number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            self.report["received"] += 1
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                self.error(number, {"json": [str(e)]})
+                continue
+            if not isinstance(record, dict):
+                self.error(number, {"json": ["Each line must be a JSON object"]})
+                continue
+            values, errors = validate(self.kind, record)
+            if errors:
+                self.error(number, errors)
+                continue
+            key = values["slug"].casefold() if self.kind == "posts" else values.get("id")
+            if key is not None:
+                if key in self.seen:
+                    field = "slug" if self.kind == "posts" else "id"
+                    self.error(number, {field: ["Duplicated in this import"]})
+                    continue
+                self.seen.add(key)
+            chunk.append((number, values))
+            if len(chunk) >= self.chunk_size:
+                self.flush(chunk)
+                chunk = []
+        if chunk:
+            self.flush(chunk)
+        self.finish()
+        return self.report
+
+    def flush(self, chunk):
+        skipped = self.report["skipped"]
+        try:
+            if self.kind == "posts":
+                inserted, updated = self.write_posts(chunk)
+            else:
+                inserted, updated = self.write_journals(chunk)
+            if self.dry_run or not (inserted or updated):
+                db.session.rollback()
+            else:
+                ContentVersion.bump(self.kind)
+                db.session.commit()
+        except SQLAlchemyError as e:
+            # El lote entero queda sin escribir; los lotes anteriores ya están confirmados
+            db.session.rollback()
+            self.report["skipped"] = skipped + len(chunk)
+            self.report["errors"].append({"lines": [chunk[0][0], chunk[-1][0]],
+                                          "errors": {"database": [str(e)]}})
+            return
+        self.report["inserted"] += inserted
+        self.report["updated"] += updated
+
+    def write_posts(self, chunk):
+        now = datetime.now(timezone.utc)
+        # Las claves van en minúsculas: con la collation de MySQL el IN encuentra "Hola" al buscar "hola",
+        # y ese registro tiene que actualizarse (o informarse como repetido) en lugar de insertarse
+        slugs = [values["slug"] for _, values in chunk]
+        existing = {row.slug.casefold(): row for row in db.session.execute(
+            db.select(Post.id, Post.slug, Post.date, Post.category, Post.author, Post.image,
+                      Post.image_variants).where(Post.slug.in_(slugs))
+        )}
+        inserts, updates, facets = [], [], Counter()
+        for number, values in chunk:
+            values = dict(values, excerpt=make_excerpt(values["content"]), updated_at=now)
+            row = existing.get(values["slug"].casefold())
+            if row is None:
+                values.setdefault("date", now)
+                inserts.append(values)
+            elif self.mode == "upsert":
+                values.setdefault("date", row.date)
+                values["image_variants"] = row.image_variants if values["image"] == row.image else None
+                updates.append(dict(values, id=row.id))
+                for kind in FacetCount.kinds:
+                    facets[kind, getattr(row, kind)] -= 1
+            else:
+                self.error(number, {"slug": ["Slug must be unique. This slug is already in use."]})
+                continue
+            for kind in FacetCount.kinds:
+                facets[kind, values[kind]] += 1
+
+        if not self.dry_run:
+            if inserts:
+                db.session.execute(db.insert(Post), inserts)
+            if updates:
+                db.session.execute(db.update(Post), updates)
+            for (kind, value), delta in facets.items():
+                if delta:
+                    FacetCount.adjust(kind, value, delta)
+        return len(inserts), len(updates)
+
+    def write_journals(self, chunk):
+        ids = [values["id"] for _, values in chunk if "id" in values]
+        existing = {row.id: row for row in db.session.execute(
+            db.select(Journal.id, Journal.year, Journal.image, Journal.image_variants)
+            .where(Journal.id.in_(ids))
+        )} if ids else {}
+        inserts, updates = [], []
+        for number, values in chunk:
+            row = existing.get(values.get("id"))
+            if row is None:
+                inserts.append(values)
+            elif self.mode == "upsert":
+                variants = row.image_variants if values["image"] == row.image else None
+                values = dict(values, image_variants=variants)
+                updates.append(values)
+                self.years.add(row.year)
+            else:
+                self.error(number, {"id": ["A journal with this id already exists"]})
+                continue
+            self.years.add(values["year"])
+
+        if not self.dry_run:
+            _execute_grouped(db.insert(Journal), inserts)
+            if updates:
+                db.session.execute(db.update(Journal), updates)
+        return len(inserts), len(updates)
+
+    # Un solo export estático al final en lugar de uno por registro
+    def finish(self):
+        if self.dry_run or not (self.report["inserted"] or self.report["updated"]):
+            return
+        if self.kind == "posts":
+            posts_rebuilt()
+        else:
+            journal_changed(*self.years)
+
+
+# Export en streaming en el mismo formato que acepta la importación, por id ascendente
+def export_records(kind):
+    model = model_for(kind)
+    fields = BULK_FIELDS[kind]
+    query = db.select(*columns_for(model, fields)).order_by(model.id) \
+        .execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+
+    def generate():
+        for rows in db.session.execute(query).partitions():
+            yield b"\n".join(json_dumps(row_to_dict(fields, row)) for row in rows) + b"\n"
+
+    return generate()
@@ -0,0 +1,154 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Flask, Response, make_response, request
+from helpers.compression import compress, compressor
+from helpers.conditional import content_version
+
+
+# Interfaz mínima que necesita la caché; un cliente compatible con Redis la cumple con get/set/delete
+class CacheBackend:
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+# LRU en memoria del proceso, con TTL por entrada y un tope de entradas. Cada worker tiene la suya,
+# pero como las claves llevan la versión guardada en la base, ninguno sirve una copia vieja
+class MemoryBackend(CacheBackend):
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Adaptador para un cliente tipo redis-py (o cualquier servidor local que hable el mismo protocolo)
+class RedisBackend(CacheBackend):
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        value = self.client.get(key)
+        return pickle.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, pickle.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+
+class ResponseCache:
+    # Las claves llevan la versión de su etiqueta ("posts", "journals") en la tabla content_version, la
+    # misma que usa el ETag de conditional: las rutas de escritura la incrementan en su transacción, así
+    # que todos los workers dejan de usar las entradas viejas, que quedan huérfanas hasta el LRU o el TTL
+    def __init__(self, app: Flask = None):
+        self.backend = None
+        self.ttl = 60
+        self.enabled = True
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.ttl = app.config.get('API_CACHE_TTL', 60)
+        self.enabled = app.config.get('API_CACHE_ENABLED', True)
+        backend = app.config.get('API_CACHE_BACKEND', 'memory')
+        if isinstance(backend, CacheBackend):
+            self.backend = backend
+        elif backend == 'redis':
+            import redis
+            self.backend = RedisBackend(redis.Redis.from_url(app.config['API_CACHE_REDIS_URL']))
+        else:
+            self.backend = MemoryBackend(app.config.get('API_CACHE_MAX_ENTRIES', 1024))
+
+    def key_for(self, tag, key):
+        return f"{tag}:{content_version(tag)[0]}:{key}"
+
+    def get(self, tag, key):
+        return self.backend.get(self.key_for(tag, key))
+
+    def set(self, tag, key, value):
+        self.backend.set(self.key_for(tag, key), value, self.ttl)
+
+    # Cada codificación (gzip, br) se comprime una sola vez por entrada y se guarda junto al cuerpo,
+    # bajo la misma versión: al cambiar el contenido también quedan descartadas las copias comprimidas
+    def compressed(self, key, response):
+        encoding = compressor.encoding_for(response)
+        if encoding is None:
+            return response
+        encoded_key = f"{key}|{encoding}"
+        data = self.backend.get(encoded_key)
+        if data is None:
+            data = compress(response.get_data(), encoding)
+            self.backend.set(encoded_key, data, self.ttl)
+        compressor.apply(response, encoding, data)
+        return response
+
+    # Decorador para vistas JSON o XML (feeds): guarda estado, cabeceras y cuerpo ya serializado.
+    # "unless" permite saltear la caché para algunas peticiones (p. ej. respuestas en streaming)
+    def cached(self, tag, unless=None):
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled or (unless is not None and unless()):
+                    return view(*args, **kwargs)
+
+                # La clave se fija antes de ejecutar la vista: si el contenido cambia mientras tanto,
+                # la respuesta queda guardada bajo la versión vieja y nunca se sirve
+                # El host va en la clave: las cabeceras Link y los feeds guardados llevan URLs absolutas
+                key = self.key_for(tag, request.host + request.full_path)
+                hit = self.backend.get(key)
+                if hit is not None:
+                    status, headers, body = hit
+                    response = Response(body, status=status, headers=headers)
+                    response.headers['X-Cache'] = 'HIT'
+                    return self.compressed(key, response)
+
+                response = make_response(view(*args, **kwargs))
+                cacheable = response.status_code in (200, 404) and not response.is_streamed
+                if cacheable:
+                    headers = [(name, value) for name, value in response.headers
+                               if name not in ('Content-Length', 'Set-Cookie')]
+                    self.backend.set(key, (response.status_code, headers, response.get_data()), self.ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return self.compressed(key, response) if cacheable else response
+            return wrapper
+        return decorator
+
+
+api_cache = ResponseCache()
@@ -0,0 +1,93 @@
+import gzip
+from flask import Flask, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    "text/html", "text/css", "text/plain", "text/xml", "text/javascript", "application/javascript",
+    "application/json", "application/x-ndjson", "application/xml", "application/rss+xml",
+    "application/atom+xml", "image/svg+xml", "image/x-icon", "image/vnd.microsoft.icon",
+}
+
+# Niveles para respuestas dinámicas: rápidos, se comprimen en cada petición (o una vez por entrada de caché)
+DYNAMIC_LEVELS = {"br": 4, "gzip": 6}
+# Niveles para los archivos estáticos: se comprimen una sola vez en el build
+STATIC_LEVELS = {"br": 11, "gzip": 9}
+
+
+def available_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data, encoding, level=None):
+    level = DYNAMIC_LEVELS[encoding] if level is None else level
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # mtime=0 para que el mismo contenido produzca siempre los mismos bytes
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_MIMETYPES or mimetype.startswith("text/")
+
+
+# La codificación preferida por el cliente entre las disponibles (brotli antes que gzip si empatan)
+def negotiate():
+    best, best_quality = None, 0
+    for encoding in available_encodings():
+        quality = request.accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# Comprime con gzip o brotli las respuestas dinámicas (JSON, HTML, feeds) que superan COMPRESS_MIN_SIZE.
+# Las respuestas servidas desde la caché de respuestas llegan ya comprimidas (ver ResponseCache.cached)
+class Compressor:
+    def __init__(self, app: Flask = None):
+        self.enabled = True
+        self.min_size = 1024
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.enabled = app.config.setdefault("COMPRESS_ENABLED", True)
+        self.min_size = app.config.setdefault("COMPRESS_MIN_SIZE", 1024)
+        app.after_request(self.after_request)
+
+    # Codificación a usar para esta respuesta, o None si no corresponde comprimirla
+    def encoding_for(self, response):
+        if not self.enabled or response.is_streamed or response.direct_passthrough:
+            return None
+        if "Content-Encoding" in response.headers or not is_compressible(response.mimetype):
+            return None
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return None
+        if (response.content_length or 0) < self.min_size:
+            return None
+        return negotiate()
+
+    def apply(self, response, encoding, data):
+        response.set_data(data)
+        response.headers["Content-Encoding"] = encoding
+
+    def after_request(self, response):
+        if not self.enabled or not is_compressible(response.mimetype):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.encoding_for(response)
+        if encoding is not None:
+            self.apply(response, encoding, compress(response.get_data(), encoding))
+        # El ETag pasa a débil: el contenido es el mismo en cada codificación pero los bytes no.
+        # También para las respuestas que ya llegan comprimidas desde la caché
+        if response.headers.get("Content-Encoding") in ("br", "gzip"):
+            etag, weak = response.get_etag()
+            if etag and not weak:
+                response.set_etag(etag, weak=True)
+        return response
+
+
+compressor = Compressor()
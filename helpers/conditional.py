@@ -0,0 +1,64 @@
+import hashlib
+from functools import wraps
+from flask import g, make_response, request
+from database.models import ContentVersion
+
+API_CACHE_CONTROL = "public, no-cache"
+PAGE_CACHE_CONTROL = "private, no-cache"
+
+
+# Se lee de la tabla una vez por petición (una búsqueda por clave primaria): el ETag y la clave de la
+# caché de respuestas usan el mismo valor, que es compartido por todos los workers.
+# Va por la sesión de la petición, así que dentro de replicas.read_only sale de la misma réplica que las
+# filas: una réplica atrasada guarda su respuesta bajo su versión vieja, nunca bajo la nueva. Se recuerda
+# por base porque si la réplica falla la vista se repite contra la primaria
+def content_version(name):
+    versions = g.setdefault("content_versions", {})
+    key = (g.get("db_replica"), name)
+    if key not in versions:
+        versions[key] = ContentVersion.current(name)
+    return versions[key]
+
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        # Comparación débil: las respuestas comprimidas llevan el ETag como W/"..."
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0, tzinfo=None) <= \
+            request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+# Responde 304 sin ejecutar la vista si el cliente ya tiene la versión actual del contenido.
+# "vary" agrega al ETag datos propios de la petición (usuario, formato) y "unless" la excluye
+def conditional(*names, cache_control=API_CACHE_CONTROL, vary=None, unless=None):
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if unless is not None and unless():
+                return view(*args, **kwargs)
+
+            versions = [content_version(name) for name in names]
+            stamps = [updated_at for _, updated_at in versions if updated_at]
+            last_modified = max(stamps) if stamps else None
+            seed = "|".join(
+                [request.full_path, str(vary() if vary is not None else "")]
+                + [f"{name}:{version}" for name, (version, _) in zip(names, versions)]
+            )
+            etag = hashlib.sha1(seed.encode()).hexdigest()
+
+            if _not_modified(etag, last_modified):
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified:
+                response.last_modified = last_modified
+            response.headers['Cache-Control'] = cache_control
+            return response
+        return wrapper
+    return decorator
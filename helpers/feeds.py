@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+from datetime import timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape, quoteattr
+from flask import current_app, request
+from database.db import db
+from database.models import Post
+
+FEED_FIELDS = ("id", "slug", "title", "author", "category", "date", "updated_at", "excerpt")
+SITEMAP_MAX_URLS = 50000
+# Documentos distintos con fragmentos guardados (rss/atom con y sin contenido completo, sitemap)
+MAX_FRAGMENT_SETS = 8
+
+RSS_MIMETYPE = "application/rss+xml"
+ATOM_MIMETYPE = "application/atom+xml"
+SITEMAP_MIMETYPE = "application/xml"
+
+
+def _utc(value):
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _rfc3339(value):
+    return _utc(value).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def site_url():
+    return (current_app.config.get("SITE_URL") or request.host_url).rstrip("/")
+
+
+def post_url(site, slug):
+    return current_app.config["POST_URL_TEMPLATE"].format(site=site, slug=slug)
+
+
+# Cada item se renderiza una sola vez y se reutiliza mientras (id, updated_at) no cambie: al publicar
+# o editar un post solo se renderiza ese item y el resto del documento es una concatenación de bytes.
+# Los documentos completos se guardan en la caché de respuestas hasta la próxima escritura.
+# Los fragmentos llevan URLs absolutas: solo se reutilizan con SITE_URL configurado. Sin él, el sitio
+# sale de la cabecera Host, que elige el cliente, y cada documento se renderiza entero
+class FeedBuilder:
+    def __init__(self):
+        self._fragments = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _render(self, kind, rows, render):
+        if not current_app.config.get("SITE_URL"):
+            return b"".join(render(row) for row in rows)
+        with self._lock:
+            cache = self._fragments.get(kind, {})
+            fresh = {}
+            for row in rows:
+                stamp = (row.id, row.updated_at or row.date)
+                fragment = cache.get(stamp)
+                if fragment is None:
+                    fragment = render(row)
+                fresh[stamp] = fragment
+            # Solo se conservan los items vigentes: los borrados o editados se descartan
+            self._fragments[kind] = fresh
+            self._fragments.move_to_end(kind)
+            while len(self._fragments) > MAX_FRAGMENT_SETS:
+                self._fragments.popitem(last=False)
+            return b"".join(fresh.values())
+
+    def latest(self, limit, full_content=False):
+        fields = FEED_FIELDS + (("content",) if full_content else ())
+        query = db.select(*[getattr(Post, name) for name in fields]) \
+            .order_by(Post.date.desc(), Post.id.desc()).limit(limit)
+        return db.session.execute(query).all()
+
+    def rss(self, site, title, description, limit, full_content=False):
+        rows = self.latest(limit, full_content)
+
+        def item(row):
+            link = escape(post_url(site, row.slug))
+            body = row.content if full_content else (row.excerpt or "")
+            return (
+                f"<item><title>{escape(row.title)}</title><link>{link}</link>"
+                f'<guid isPermaLink="true">{link}</guid>'
+                f"<pubDate>{format_datetime(_utc(row.date))}</pubDate>"
+                f"<dc:creator>{escape(row.author)}</dc:creator><category>{escape(row.category)}</category>"
+                f"<description>{escape(body)}</description></item>"
+            ).encode()
+
+        items = self._render(("rss", full_content), rows, item)
+        updated = format_datetime(_utc(max(row.updated_at or row.date for row in rows))) if rows else ""
+        head = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:dc="http://purl.org/dc/elements/1.1/" '
+            'xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            f"<title>{escape(title)}</title><link>{escape(site)}/</link>"
+            f"<description>{escape(description)}</description>"
+            f"<atom:link href={quoteattr(site + '/feed.xml')} rel=\"self\" type=\"{RSS_MIMETYPE}\"/>"
+            f"<lastBuildDate>{updated}</lastBuildDate>"
+        ).encode()
+        return head + items + b"</channel></rss>"
+
+    def atom(self, site, title, limit, full_content=False):
+        rows = self.latest(limit, full_content)
+
+        def entry(row):
+            link = escape(post_url(site, row.slug))
+            body = (f'<content type="html">{escape(row.content)}</content>' if full_content
+                    else f"<summary>{escape(row.excerpt or '')}</summary>")
+            return (
+                f"<entry><title>{escape(row.title)}</title><link href=\"{link}\"/><id>{link}</id>"
+                f"<published>{_rfc3339(row.date)}</published>"
+                f"<updated>{_rfc3339(row.updated_at or row.date)}</updated>"
+                f"<author><name>{escape(row.author)}</name></author>"
+                f"<category term={quoteattr(row.category)}/>{body}</entry>"
+            ).encode()
+
+        entries = self._render(("atom", full_content), rows, entry)
+        updated = _rfc3339(max(row.updated_at or row.date for row in rows)) if rows else ""
+        head = (
+            '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{escape(title)}</title><id>{escape(site)}/</id>"
+            f"<link href={quoteattr(site + '/')}/>"
+            f"<link href={quoteattr(site + '/atom.xml')} rel=\"self\" type=\"{ATOM_MIMETYPE}\"/>"
+            f"<updated>{updated}</updated>"
+        ).encode()
+        return head + entries + b"</feed>"
+
+    # Todas las URLs de posts (hasta el límite del protocolo) sin cargar contenido ni resúmenes
+    def sitemap(self, site):
+        query = db.select(Post.id, Post.slug, Post.date, Post.updated_at) \
+            .order_by(Post.date.desc(), Post.id.desc()).limit(SITEMAP_MAX_URLS)
+        rows = db.session.execute(query).all()
+
+        def url(row):
+            return (f"<url><loc>{escape(post_url(site, row.slug))}</loc>"
+                    f"<lastmod>{_rfc3339(row.updated_at or row.date)}</lastmod></url>").encode()
+
+        urls = self._render(("sitemap",), rows, url)
+        return (
+            b'<?xml version="1.0" encoding="UTF-8"?>'
+            b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + f"<url><loc>{escape(site)}/</loc></url>".encode() + urls + b"</urlset>"
+        )
+
+
+feeds = FeedBuilder()
@@ -1,6 +1,8 @@
+from PIL import Image
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileAllowed, FileField
 from wtforms import StringField, IntegerField, DateTimeField, SubmitField, PasswordField, TextAreaField
-from wtforms.validators import InputRequired, Length, URL, NumberRange, ValidationError
+from wtforms.validators import InputRequired, Length, URL, NumberRange, Optional, ValidationError
 from database.models import Post, Journal  # Asegúrate de importar tus modelos Post y Journal
 
 
@@ -10,17 +12,36 @@ class LoginForm(FlaskForm):
     submit = SubmitField(label="Sign in")
 
 
+IMAGE_EXTENSIONS = ['jpg', 'jpeg', 'png', 'webp', 'gif']
+
+
+# Comprueba que el archivo subido sea una imagen que Pillow pueda leer
+def check_image_file(form, field):
+    if field.data:
+        try:
+            with Image.open(field.data) as image:
+                image.verify()
+        except Exception:
+            raise ValidationError('El archivo no es una imagen válida')
+        finally:
+            field.data.seek(0)
+
+
 class PostForm(FlaskForm):
     author = StringField(label="Autor", validators=[InputRequired(), Length(min=1, max=100)])
     title = StringField(label="Título", validators=[InputRequired(), Length(min=1, max=250)])
-    image = StringField(label="URL de Imagen", validators=[InputRequired(), Length(max=250)])
+    image = StringField(label="URL de Imagen", validators=[Length(max=250)])
+    image_file = FileField(label="O subir imagen",
+                           validators=[FileAllowed(IMAGE_EXTENSIONS, 'Solo imágenes'), check_image_file])
     content = TextAreaField(label="Contenido", validators=[InputRequired()])
     category = StringField(label="Categoría", validators=[InputRequired(), Length(min=1, max=100)])
     slug = StringField(label="Slug", validators=[InputRequired(), Length(min=1, max=100)])
     submit = SubmitField(label="Crear Nuevo Post")
 
     def validate_image(form, field):
-        if not field.data.startswith(('http://', 'https://')):
+        if not field.data and not form.image_file.data:
+            raise ValidationError('Ingresa una URL de imagen o sube un archivo')
+        if field.data and not field.data.startswith(('http://', 'https://')):
             raise ValidationError('Formato de URL no válido para imagen. Debe de empezar con http:// or https://')
 
 
@@ -30,7 +51,9 @@ class JournalForm(FlaskForm):
     year = IntegerField(label="Año", validators=[InputRequired(), NumberRange(min=2000, max=2100)])
     title = StringField(label="Título", validators=[InputRequired(), Length(min=1, max=250)])
     url = StringField(label="URL", validators=[InputRequired(), Length(max=250), URL()])
-    image = StringField(label="URL de Imagen", validators=[Length(max=250), URL()])
+    image = StringField(label="URL de Imagen", validators=[Optional(), Length(max=250), URL()])
+    image_file = FileField(label="O subir imagen",
+                           validators=[FileAllowed(IMAGE_EXTENSIONS, 'Solo imágenes'), check_image_file])
     submit = SubmitField(label="Crear Nuevo Journal")
 
     def validate_image(form, field):
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+import urllib.request
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, current_app, send_from_directory, url_for
+from PIL import Image, ImageOps
+from database.db import db
+from database.models import ContentVersion, Journal, Post
+from helpers.jobs import jobs
+
+IMAGE_WIDTHS = (320, 640, 1280)
+IMAGE_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}),
+                 "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+MEDIA_MAX_AGE = 31536000
+MEDIA_PREFIX = "/media/"
+
+logger = logging.getLogger("penumbra.images")
+
+
+def content_name(data, suffix):
+    return f"{hashlib.sha256(data).hexdigest()[:20]}{suffix}"
+
+
+# Genera las variantes redimensionadas de una imagen. No depende de la app, así que corre en
+# cualquier thread del pool; Pillow libera el GIL al decodificar, redimensionar y codificar.
+# Devuelve [(formato, ancho, bytes)], sin ampliar imágenes más chicas que el ancho pedido
+def build_variants(data, widths=IMAGE_WIDTHS):
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGB")
+    targets = sorted({min(width, image.width) for width in widths})
+    variants = []
+    for width in targets:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS) if width != image.width else image
+        for fmt, (pil_format, options) in IMAGE_FORMATS.items():
+            output = io.BytesIO()
+            resized.save(output, pil_format, **options)
+            variants.append((fmt, width, output.getvalue()))
+    return variants
+
+
+# Procesa las imágenes de posts y journals una sola vez: descarga la URL (o lee el archivo subido),
+# guarda las variantes en IMAGE_DIR con nombres por hash de contenido y las registra en
+# "image_variants" del modelo. Las variantes se sirven desde /media con caché de un año
+class ImagePipeline:
+    def __init__(self, app: Flask = None):
+        self.directory = None
+        self.executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.directory = app.config.setdefault("IMAGE_DIR", os.path.join(app.instance_path, "media"))
+        app.config.setdefault("IMAGE_WORKERS", 2)
+        app.config.setdefault("IMAGE_FETCH_TIMEOUT", 10)
+        app.config.setdefault("IMAGE_MAX_BYTES", 10 * 1024 * 1024)
+        app.add_url_rule(MEDIA_PREFIX + "<path:name>", "media", self.media_view)
+        app.add_template_global(self.srcset, "image_srcset")
+        app.add_template_global(self.thumbnail, "image_thumbnail")
+
+    # Pool creado en el primer uso, dentro del worker de gunicorn y no antes del fork
+    def pool(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=current_app.config["IMAGE_WORKERS"],
+                                               thread_name_prefix="images")
+        return self.executor
+
+    def media_view(self, name):
+        response = send_from_directory(self.directory, name, max_age=MEDIA_MAX_AGE)
+        response.cache_control.immutable = True
+        response.cache_control.public = True
+        return response
+
+    # Las imágenes subidas ya están en IMAGE_DIR: se leen del disco en lugar de pedirlas por HTTP
+    def fetch(self, url):
+        path = urlsplit(url).path
+        if path.startswith(MEDIA_PREFIX):
+            local = os.path.join(self.directory, os.path.basename(path))
+            if os.path.isfile(local):
+                with open(local, "rb") as image_file:
+                    return image_file.read()
+        if not url.startswith(("http://", "https://")):
+            raise ValueError(f"Unsupported image URL: {url}")
+        limit = current_app.config["IMAGE_MAX_BYTES"]
+        request = urllib.request.Request(url, headers={"User-Agent": "penumbra-images"})
+        with urllib.request.urlopen(request, timeout=current_app.config["IMAGE_FETCH_TIMEOUT"]) as response:
+            data = response.read(limit + 1)
+        if len(data) > limit:
+            raise ValueError(f"Image larger than {limit} bytes: {url}")
+        return data
+
+    # Escritura atómica; si el archivo ya existe (mismo hash) no se vuelve a escribir
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        if os.path.exists(path):
+            return name
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        return name
+
+    # Guarda un archivo subido desde el admin (ya validado por el formulario) y devuelve su URL pública
+    def store_upload(self, data):
+        with Image.open(io.BytesIO(data)) as image:
+            suffix = "." + image.format.lower()
+        return url_for("media", name=self.write(content_name(data, suffix), data), _external=True)
+
+    def process(self, url):
+        data = self.fetch(url)
+        variants = {"source": url}
+        for fmt, width, encoded in build_variants(data):
+            name = self.write(content_name(encoded, f"-{width}.{'jpg' if fmt == 'jpeg' else fmt}"), encoded)
+            variants.setdefault(fmt, []).append([width, name])
+        return variants
+
+    # Registra las variantes solo si la imagen del registro no cambió mientras se procesaba
+    def ingest(self, model, record_id, url):
+        variants = self.process(url)
+        result = db.session.execute(
+            db.update(model).where(model.id == record_id, model.image == url).values(image_variants=variants)
+        )
+        if result.rowcount:
+            name = model.__tablename__ + "s"
+            ContentVersion.bump(name)
+            db.session.commit()
+        return variants
+
+    def _run(self, app, model, record_id, url):
+        with app.app_context():
+            try:
+                self.ingest(model, record_id, url)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Image processing failed for %s %s (%s)", model.__name__, record_id, url)
+            finally:
+                db.session.remove()
+
+    # Procesa en el pool de threads, para cargas masivas (flask build-images)
+    def submit(self, model, record_id, url):
+        app = current_app._get_current_object()
+        return self.pool().submit(self._run, app, model, record_id, url)
+
+    # Llamado desde las rutas de escritura después del commit: el trabajo queda en la cola de jobs.
+    # Los archivos subidos ya están en IMAGE_DIR, así que el job los lee del disco
+    def schedule(self, model, record_id, url):
+        if url:
+            jobs.enqueue("images.ingest", model=model.__name__, record_id=record_id, url=url)
+
+    def _url(self, name):
+        return url_for("media", name=name)
+
+    def srcset(self, variants, fmt="jpeg"):
+        return ", ".join(f"{self._url(name)} {width}w" for width, name in (variants or {}).get(fmt, []))
+
+    # La variante más chica que cubre el ancho pedido, para el src de respaldo
+    def thumbnail(self, variants, width=IMAGE_WIDTHS[0], fmt="jpeg"):
+        candidates = (variants or {}).get(fmt)
+        if not candidates:
+            return None
+        for candidate_width, name in candidates:
+            if candidate_width >= width:
+                return self._url(name)
+        return self._url(candidates[-1][1])
+
+
+images = ImagePipeline()
+
+
+@jobs.task("images.ingest")
+def ingest_job(model, record_id, url):
+    images.ingest({"Post": Post, "Journal": Journal}[model], record_id, url)
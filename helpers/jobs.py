@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import traceback
+import uuid
+from datetime import datetime
+from flask import Flask
+from database.db import db
+from helpers.serialization import json_dumps
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+logger = logging.getLogger("penumbra.jobs")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    args TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    run_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    worker TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_job_status_run_at ON job (status, run_at);
+"""
+
+
+# Cola de trabajos persistente en un archivo SQLite propio, compartido por todos los workers de
+# gunicorn de la máquina. Las rutas de escritura encolan después del commit y threads en segundo
+# plano ejecutan los trabajos con reintentos (espera exponencial) hasta JOB_MAX_ATTEMPTS.
+# Los trabajos se registran por nombre con @jobs.task y reciben argumentos JSON
+class JobQueue:
+    def __init__(self, app: Flask = None):
+        self.app = None
+        self.path = None
+        self.tasks = {}
+        self.workers = 1
+        self.max_attempts = 3
+        self.retry_delay = 5.0
+        self.stale_after = 600.0
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._started_pid = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.app = app
+        self.path = app.config.setdefault("JOB_QUEUE_PATH", os.path.join(app.instance_path, "jobs.sqlite3"))
+        self.workers = app.config.setdefault("JOB_WORKERS", 1)
+        self.max_attempts = app.config.setdefault("JOB_MAX_ATTEMPTS", 3)
+        self.retry_delay = app.config.setdefault("JOB_RETRY_DELAY", 5.0)
+        self.stale_after = app.config.setdefault("JOB_STALE_AFTER", 600.0)
+        # Los threads arrancan con la primera petición de cada proceso, nunca antes del fork
+        if self.workers:
+            app.before_request(self.start)
+
+    def task(self, name):
+        def decorator(func):
+            self.tasks[name] = func
+            return func
+        return decorator
+
+    # Una conexión por thread; WAL permite leer el estado mientras otro proceso escribe
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def enqueue(self, name, delay=0, **args):
+        if name not in self.tasks:
+            raise KeyError(f"Unknown job: {name}")
+        now = time.time()
+        cursor = self.connection().execute(
+            "INSERT INTO job (name, args, run_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (name, json_dumps(args).decode(), now + delay, now, now),
+        )
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    # Toma el próximo trabajo pendiente; BEGIN IMMEDIATE evita que dos procesos tomen el mismo.
+    # Un trabajo "running" sin renovar en JOB_STALE_AFTER se considera huérfano (worker caído)
+    def claim(self, worker):
+        connection = self.connection()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute(
+                "SELECT * FROM job WHERE (status = 'queued' AND run_at <= ?) "
+                "OR (status = 'running' AND updated_at <= ?) ORDER BY run_at, id LIMIT 1",
+                (now, now - self.stale_after),
+            ).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE job SET status = 'running', attempts = attempts + 1, worker = ?, updated_at = ? "
+                    "WHERE id = ?",
+                    (worker, now, row["id"]),
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return row
+
+    # Mientras un trabajo corre se renueva su updated_at cada tercio de JOB_STALE_AFTER: claim() no lo
+    # toma como huérfano aunque dure más que eso, y si el proceso muere deja de renovarse
+    def heartbeat(self, job_id, stop):
+        while not stop.wait(self.stale_after / 3):
+            try:
+                self.connection().execute("UPDATE job SET updated_at = ? WHERE id = ? AND status = 'running'",
+                                          (time.time(), job_id))
+            except sqlite3.Error:
+                logger.warning("Could not renew job %s", job_id, exc_info=True)
+
+    def execute(self, row):
+        connection = self.connection()
+        attempts = row["attempts"] + 1
+        stop = threading.Event()
+        threading.Thread(target=self.heartbeat, args=(row["id"], stop), name=f"job-{row['id']}-heartbeat",
+                         daemon=True).start()
+        try:
+            with self.app.app_context():
+                try:
+                    self.tasks[row["name"]](**json.loads(row["args"]))
+                finally:
+                    stop.set()
+                    db.session.remove()
+        except Exception:
+            error = traceback.format_exc()
+            logger.warning("Job %s (%s) failed on attempt %s", row["id"], row["name"], attempts,
+                           exc_info=True)
+            if attempts < self.max_attempts and row["name"] in self.tasks:
+                run_at = time.time() + self.retry_delay * 2 ** (attempts - 1)
+                connection.execute("UPDATE job SET status = 'queued', run_at = ?, updated_at = ?, error = ? "
+                                   "WHERE id = ?", (run_at, time.time(), error, row["id"]))
+            else:
+                connection.execute("UPDATE job SET status = 'failed', updated_at = ?, error = ? WHERE id = ?",
+                                   (time.time(), error, row["id"]))
+            return False
+        connection.execute("UPDATE job SET status = 'done', updated_at = ?, error = NULL WHERE id = ?",
+                           (time.time(), row["id"]))
+        return True
+
+    # Ejecuta en este thread todos los trabajos listos (CLI, pruebas); devuelve cuántos corrió
+    def run_pending(self):
+        worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        count = 0
+        while True:
+            row = self.claim(worker)
+            if row is None:
+                return count
+            self.execute(row)
+            count += 1
+
+    def work(self, poll_interval=1.0):
+        worker = f"{os.getpid()}-{threading.current_thread().name}"
+        while True:
+            try:
+                row = self.claim(worker)
+                if row is not None:
+                    self.execute(row)
+                    continue
+            except sqlite3.Error:
+                logger.exception("Job queue unavailable")
+            self._wakeup.wait(poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        if self._started_pid == os.getpid():
+            return
+        with self._lock:
+            if self._started_pid == os.getpid():
+                return
+            for n in range(self.workers):
+                threading.Thread(target=self.work, name=f"jobs-{n}", daemon=True).start()
+            self._started_pid = os.getpid()
+
+    def counts(self):
+        rows = self.connection().execute("SELECT status, COUNT(*) FROM job GROUP BY status").fetchall()
+        counts = dict.fromkeys(JOB_STATUSES, 0)
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def recent(self, limit=50, status=None):
+        query = "SELECT * FROM job" + (" WHERE status = ?" if status else "") + " ORDER BY id DESC LIMIT ?"
+        rows = self.connection().execute(query, ((status,) if status else ()) + (limit,)).fetchall()
+        return [dict(row, updated_at=datetime.fromtimestamp(row["updated_at"])) for row in rows]
+
+    def retry(self, job_id):
+        cursor = self.connection().execute(
+            "UPDATE job SET status = 'queued', attempts = 0, run_at = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'failed'", (time.time(), time.time(), job_id)
+        )
+        self._wakeup.set()
+        return cursor.rowcount
+
+    # Borra los trabajos terminados hace más de "older_than" segundos
+    def purge(self, older_than=7 * 86400):
+        cursor = self.connection().execute("DELETE FROM job WHERE status = 'done' AND updated_at < ?",
+                                           (time.time() - older_than,))
+        return cursor.rowcount
+
+
+jobs = JobQueue()
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from database.db import db
+from database.pool import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+slow_query_logger = logging.getLogger("penumbra.slow_sql")
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.total += 1
+        self.sum += value
+        for n, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[n] += 1
+
+    def lines(self, name, labels):
+        for bound, count in zip(self.buckets, self.counts):
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.total}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {self.total}"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+class Metrics:
+    # Mide cada petición (latencia, cantidad de consultas SQL y tiempo en la base), agrega
+    # la cabecera Server-Timing, registra las consultas lentas y expone todo en /metrics.
+    # Los valores son por proceso: con varios workers de gunicorn, Prometheus los suma por instancia
+    def __init__(self, app: Flask = None):
+        self.slow_query_seconds = 0.2
+        self._lock = threading.Lock()
+        self._latency = {}
+        self._queries = {}
+        self._db_time = {}
+        self._requests = {}
+        self._slow_queries = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.slow_query_seconds = app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+        if not event.contains(Engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.db_queries = 0
+        g.db_time = 0.0
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        if has_request_context() and "db_queries" in g:
+            g.db_queries += 1
+            g.db_time += elapsed
+        if elapsed >= self.slow_query_seconds:
+            with self._lock:
+                self._slow_queries += 1
+            slow_query_logger.warning(
+                "Slow query (%.1f ms) on %s: %s | params=%r",
+                elapsed * 1000, request.endpoint if has_request_context() else "-", statement, parameters,
+            )
+
+    def _after_request(self, response):
+        if "metrics_start" not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = request.endpoint or "unmatched"
+
+        with self._lock:
+            self._latency.setdefault(endpoint, Histogram(LATENCY_BUCKETS)).observe(elapsed)
+            self._queries.setdefault(endpoint, Histogram(QUERY_BUCKETS)).observe(g.db_queries)
+            self._db_time[endpoint] = self._db_time.get(endpoint, 0.0) + g.db_time
+            key = (endpoint, request.method, response.status_code)
+            self._requests[key] = self._requests.get(key, 0) + 1
+
+        response.headers.add(
+            "Server-Timing",
+            f'app;dur={elapsed * 1000:.1f}, db;dur={g.db_time * 1000:.1f};desc="{g.db_queries} queries"',
+        )
+        return response
+
+    def render(self, engines=None):
+        lines = []
+        with self._lock:
+            lines += ["# HELP http_request_duration_seconds Request latency per endpoint",
+                      "# TYPE http_request_duration_seconds histogram"]
+            for endpoint, histogram in sorted(self._latency.items()):
+                lines += histogram.lines("http_request_duration_seconds", f'endpoint="{_label(endpoint)}"')
+
+            lines += ["# HELP http_requests_total Requests per endpoint, method and status",
+                      "# TYPE http_requests_total counter"]
+            for (endpoint, method, status), count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{endpoint="{_label(endpoint)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            lines += ["# HELP db_queries_per_request SQL statements issued per request",
+                      "# TYPE db_queries_per_request histogram"]
+            for endpoint, histogram in sorted(self._queries.items()):
+                lines += histogram.lines("db_queries_per_request", f'endpoint="{_label(endpoint)}"')
+
+            lines += ["# HELP db_time_seconds_total Time spent in SQL per endpoint",
+                      "# TYPE db_time_seconds_total counter"]
+            for endpoint, seconds in sorted(self._db_time.items()):
+                lines.append(f'db_time_seconds_total{{endpoint="{_label(endpoint)}"}} {seconds:.6f}')
+
+            lines += ["# HELP db_slow_queries_total Queries above the slow query threshold",
+                      "# TYPE db_slow_queries_total counter",
+                      f"db_slow_queries_total {self._slow_queries}"]
+
+        for bind, engine in (engines or {}).items():
+            stats = pool_stats(engine)
+            labels = f'bind="{_label(bind or "primary")}"'
+            for name in ("size", "checked_in", "checked_out", "overflow", "checkouts", "timeouts",
+                         "invalidations", "wait_avg_ms", "wait_max_ms"):
+                if name in stats:
+                    lines.append(f"db_pool_{name}{{{labels}}} {stats[name]}")
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return Response(self.render(db.engines), mimetype="text/plain; version=0.0.4")
+
+
+metrics = Metrics()
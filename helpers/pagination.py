@@ -0,0 +1,155 @@
+import base64
+import binascii
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from database.db import db
+from helpers.cache import MemoryBackend
+from helpers.conditional import content_version
+from helpers.serialization import columns_for
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class PaginationError(ValueError):
+    pass
+
+
+# El cursor es opaco para el cliente: codifica la clave (date, id) de la última fila entregada
+def encode_cursor(date, row_id):
+    raw = f"{date.isoformat()}|{row_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, row_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(date), int(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError("Invalid cursor")
+
+
+def parse_limit(value, maximum=MAX_LIMIT):
+    if value is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PaginationError("limit must be an integer")
+    if limit < 1:
+        raise PaginationError("limit must be greater than 0")
+    return min(limit, maximum)
+
+
+# Valida el parámetro "fields=a,b,c" contra los campos públicos del modelo
+def parse_fields(value, model):
+    if not value:
+        return list(model.api_fields)
+    fields = [field.strip() for field in value.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in model.api_fields]
+    if unknown:
+        raise PaginationError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+# Proyección de columnas: la consulta devuelve tuplas (Row) en lugar de instancias ORM
+def project(query, model, fields):
+    return query.with_entities(*columns_for(model, fields, with_cursor=True))
+
+
+# Filas posteriores al cursor en orden (date, id) descendente.
+# "date <= :date" va primero para que el índice (date, id) pueda hacer un range scan
+def after_cursor(model, cursor):
+    date, row_id = decode_cursor(cursor)
+    return and_(model.date <= date, or_(model.date < date, model.id < row_id))
+
+
+# Paginación por clave (date, id) descendente: cada página cuesta lo mismo sin importar su profundidad.
+# Sirve tanto para Query como para select(); se pide una fila extra para saber si hay página siguiente
+def keyset_query(query, model, cursor=None, limit=DEFAULT_LIMIT):
+    query = query.order_by(model.date.desc(), model.id.desc())
+    if cursor:
+        query = query.filter(after_cursor(model, cursor))
+    return query.limit(limit + 1)
+
+
+def split_page(rows, limit):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+    return rows, next_cursor
+
+
+def keyset_page(query, model, cursor=None, limit=DEFAULT_LIMIT):
+    return split_page(keyset_query(query, model, cursor, limit).all(), limit)
+
+
+# Filas anteriores al cursor (más nuevas), para volver a la página previa
+def before_cursor(model, cursor):
+    date, row_id = decode_cursor(cursor)
+    return and_(model.date >= date, or_(model.date > date, model.id > row_id))
+
+
+# "?date=YYYY-MM-DD" salta a los registros de ese día o anteriores: equivale a un cursor
+# (medianoche del día siguiente, id 0), así el salto también es un range scan sobre (date, id)
+def date_cursor(value):
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise PaginationError("date must be YYYY-MM-DD")
+    return encode_cursor(day + timedelta(days=1), 0)
+
+
+# Total por tipo de contenido, guardado por worker junto a la versión de ContentVersion: solo se
+# vuelve a contar después de una escritura. La versión es la misma que ya leyó conditional para el
+# ETag, así que en el resto de las páginas el total no agrega consultas
+_totals = MemoryBackend(max_entries=16)
+
+
+def cached_total(model):
+    name = model.__tablename__ + "s"
+    key = f"{name}:{content_version(name)[0]}"
+    total = _totals.get(key)
+    if total is None:
+        total = db.session.execute(db.select(db.func.count()).select_from(model)).scalar()
+        _totals.set(key, total)
+    return total
+
+
+class AdminPage:
+    def __init__(self, items, next_cursor, prev_cursor, total, per_page):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.per_page = per_page
+
+
+def _exists(query, condition):
+    return query.filter(condition).limit(1).first() is not None
+
+
+# Paginación de los listados del admin sin COUNT(*) ni OFFSET: "after"/"before" son cursores
+# (date, id) y "date" salta a un día. Cada página cuesta una consulta por índice más, como mucho,
+# una comprobación de existencia en el sentido contrario
+def admin_page(query, model, after=None, before=None, date=None, per_page=DEFAULT_LIMIT):
+    if date:
+        after = date_cursor(date)
+    if before:
+        rows = query.filter(before_cursor(model, before)) \
+            .order_by(model.date.asc(), model.id.asc()).limit(per_page + 1).all()
+        if len(rows) <= per_page:
+            # No hay nada más nuevo que esta página: es la primera
+            return admin_page(query, model, per_page=per_page)
+        rows = rows[:per_page][::-1]
+        prev_cursor = encode_cursor(rows[0].date, rows[0].id)
+        next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+        return AdminPage(rows, next_cursor, prev_cursor, cached_total(model), per_page)
+
+    rows, next_cursor = keyset_page(query, model, after, per_page)
+    prev_cursor = None
+    if after and rows and _exists(query, before_cursor(model, encode_cursor(rows[0].date, rows[0].id))):
+        prev_cursor = encode_cursor(rows[0].date, rows[0].id)
+    return AdminPage(rows, next_cursor, prev_cursor, cached_total(model), per_page)
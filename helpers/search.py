@@ -0,0 +1,124 @@
+import re
+import unicodedata
+from markupsafe import escape
+from sqlalchemy import and_, event, or_
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import Engine
+from database.db import db
+from database.models import Post
+
+MIN_TERM_LENGTH = 3
+MAX_TERMS = 8
+SNIPPET_RADIUS = 90
+FOLD_FUNCTION = "penumbra_fold"
+
+# Palabras vacías del español que no aportan a la búsqueda (InnoDB trae su propia lista en inglés)
+STOPWORDS = set("""
+    algo algun alguna algunas alguno algunos ante antes aquel aquella aquellas aquellos aqui cada como
+    con contra cual cuando del desde donde dos el ella ellas ellos en entre era eran esa esas ese eso
+    esos esta estaba estas este esto estos fue fueron hay las les los mas mismo mucho muy nada ni nos
+    nosotros otra otras otro otros para pero poco por porque que quien se ser sin sobre son su sus
+    tambien tan tanto todo todos tu tus una uno unos usted ya
+""".split())
+
+# Terminaciones flexivas más comunes (plural y género); se recortan y se busca por prefijo
+SUFFIXES = ("ciones", "cion", "mente", "es", "as", "os", "s", "a", "o", "e")
+
+
+class SearchError(ValueError):
+    pass
+
+
+def fold(text):
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _fold_value(value):
+    return fold(value) if value is not None else None
+
+
+# SQLite no quita tildes: cada conexión registra fold() como función SQL y el LIKE del respaldo compara
+# el texto plegado de los dos lados. Solo las conexiones SQLite (sqlite3 y aiosqlite) tienen create_function
+@event.listens_for(Engine, "connect")
+def _register_fold(dbapi_connection, connection_record):
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function(FOLD_FUNCTION, 1, _fold_value, deterministic=True)
+
+
+# Stemmer liviano: "películas" -> "pelicul", "revistas" -> "revist", "canciones" -> "cancion"
+def stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_TERM_LENGTH + 1:
+            stemmed = word[:-len(suffix)]
+            return stemmed + "cion" if suffix == "ciones" else stemmed
+    return word
+
+
+def parse_query(query):
+    words = re.findall(r"\w+", fold(query or ""))
+    stems = []
+    for word in words:
+        if len(word) < MIN_TERM_LENGTH or word in STOPWORDS:
+            continue
+        term = stem(word)
+        if term not in stems:
+            stems.append(term)
+    if not stems:
+        raise SearchError("Query must contain at least one significant word")
+    return stems[:MAX_TERMS]
+
+
+# En MySQL usa el índice FULLTEXT (title, content) en modo booleano: todos los términos son
+# obligatorios y se buscan por prefijo. En otros motores (SQLite de desarrollo) cae a LIKE
+def search_statement(stems, limit, offset, dialect):
+    columns = (Post.id, Post.slug, Post.title, Post.date, Post.content)
+    if dialect == "mysql":
+        against = " ".join(f"+{term}*" for term in stems)
+        score = match(Post.title, Post.content, against=against).in_boolean_mode()
+        query = db.select(*columns, score.label("score")) \
+            .where(score).order_by(db.desc("score"), Post.id.desc())
+    else:
+        folded = getattr(db.func, FOLD_FUNCTION)
+        title, content = folded(Post.title), folded(Post.content)
+        conditions = [or_(title.contains(term, autoescape=True), content.contains(term, autoescape=True))
+                      for term in stems]
+        query = db.select(*columns, db.literal(None).label("score")) \
+            .where(and_(*conditions)).order_by(Post.date.desc(), Post.id.desc())
+    return query.limit(limit).offset(offset)
+
+
+def search_posts(stems, limit, offset):
+    dialect = db.session.get_bind().dialect.name
+    return db.session.execute(search_statement(stems, limit, offset, dialect)).all()
+
+
+# Fragmento del contenido alrededor de la primera coincidencia, con los términos marcados en <mark>
+def snippet(content, stems):
+    folded = fold(content)
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in stems) + r")\w*")
+    first = pattern.search(folded)
+    start = max(first.start() - SNIPPET_RADIUS, 0) if first else 0
+    end = min(start + 2 * SNIPPET_RADIUS, len(content))
+
+    # El texto plegado conserva las posiciones del original mientras NFKD no cambie la longitud
+    if len(folded) != len(content):
+        return str(escape(content[start:end]))
+    parts, cursor = [], start
+    for found in pattern.finditer(folded, start, end):
+        parts.append(str(escape(content[cursor:found.start()])))
+        parts.append(f"<mark>{escape(content[found.start():found.end()])}</mark>")
+        cursor = found.end()
+    parts.append(str(escape(content[cursor:end])))
+    return ("…" if start > 0 else "") + "".join(parts) + ("…" if end < len(content) else "")
+
+
+def serialize_result(row, stems):
+    return {
+        "id": row.id,
+        "slug": row.slug,
+        "title": row.title,
+        "date": row.date.isoformat(),
+        "score": row.score,
+        "snippet": snippet(row.content, stems),
+    }
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+# Codificador JSON rápido si orjson está instalado; si no, la librería estándar.
+# Ambos devuelven bytes y escriben las fechas en formato ISO 8601
+def _stdlib_dumps(data):
+    return json.dumps(data, default=_default, separators=(",", ":")).encode()
+
+
+def _orjson_dumps(data):
+    return orjson.dumps(data)
+
+
+json_dumps = _orjson_dumps if orjson is not None else _stdlib_dumps
+
+
+# Columnas del modelo a seleccionar para "fields"; "id" y "date" se agregan porque forman el cursor
+def columns_for(model, fields, with_cursor=False):
+    names = list(fields)
+    if with_cursor:
+        names += [name for name in ("id", "date") if name not in names]
+    return [getattr(model, name) for name in names]
+
+
+# Convierte tuplas de columnas (Row) en dicts con solo los campos pedidos, sin instancias ORM.
+# columns_for pone los campos pedidos primero, así zip descarta las columnas extra del cursor
+def row_to_dict(fields, row):
+    return dict(zip(fields, row))
+
+
+def rows_to_dicts(fields, rows):
+    return [row_to_dict(fields, row) for row in rows]
+
+
+def json_response(data, status=200):
+    return Response(json_dumps(data), status=status, mimetype="application/json")
@@ -0,0 +1,237 @@
+import os
+import re
+import tempfile
+from datetime import datetime
+from urllib.parse import quote
+from flask import current_app
+from database.db import db
+from database.models import FacetCount, Journal, Post
+from helpers.jobs import jobs
+from helpers.serialization import columns_for, json_dumps, row_to_dict, rows_to_dicts
+
+PAGE_SIZE = 50
+SUMMARY_FIELDS = ("id", "slug", "title", "date", "category", "author", "image", "excerpt")
+PAGE_FILE = re.compile(r"page-(\d+)\.json")
+
+# Estructura del directorio exportado (pensado para que nginx o un CDN lo sirvan tal cual):
+#   posts/index.json            manifiesto: total, tamaño y cantidad de páginas
+#   posts/page-N.json           resúmenes; la página 1 es la más antigua, así publicar un post
+#                               solo reescribe la última página
+#   posts/slug/<slug>.json      post completo
+#   categories/index.json       categorías con su cantidad de posts
+#   categories/<categoría>.json resúmenes de la categoría, del más nuevo al más viejo
+#   journals/index.json         años con journals
+#   journals/<año>.json         journals del año
+
+
+def _filename(value):
+    return quote(str(value), safe="") + ".json"
+
+
+class SnapshotWriter:
+    def __init__(self, root):
+        self.root = root
+        self.written = set()
+
+    # Escritura atómica: archivo temporal en el mismo directorio y os.replace
+    def write(self, relative_path, data):
+        path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(json_dumps(data))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self.written.add(os.path.normpath(relative_path))
+
+    def remove(self, relative_path):
+        try:
+            os.remove(os.path.join(self.root, relative_path))
+        except FileNotFoundError:
+            pass
+
+    # Export completo: borra los archivos que ya no corresponden a ningún contenido
+    def prune(self):
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                relative_path = os.path.normpath(os.path.relpath(os.path.join(directory, name), self.root))
+                if relative_path.endswith(".json") and relative_path not in self.written:
+                    os.remove(os.path.join(self.root, relative_path))
+
+
+def _summaries(*conditions):
+    query = db.select(*columns_for(Post, SUMMARY_FIELDS)).where(*conditions) \
+        .order_by(Post.date.desc(), Post.id.desc())
+    return rows_to_dicts(SUMMARY_FIELDS, db.session.execute(query))
+
+
+def _post_count():
+    return db.session.scalar(db.select(db.func.count(Post.id)))
+
+
+def _page_count(total):
+    return max((total + PAGE_SIZE - 1) // PAGE_SIZE, 1)
+
+
+# Número de página (desde la más antigua) en la que cae un post con esta clave (date, id)
+def _page_of(date, post_id):
+    older = db.session.scalar(
+        db.select(db.func.count(Post.id))
+        .where(db.or_(Post.date < date, db.and_(Post.date == date, Post.id < post_id)))
+    )
+    return older // PAGE_SIZE + 1
+
+
+# Borra las páginas del índice por encima de "pages" que haya en disco, sin suponer cuántas había
+# (después de borrar posts, o si algún export anterior quedó a medias)
+def remove_pages_after(writer, pages):
+    try:
+        names = os.listdir(os.path.join(writer.root, "posts"))
+    except FileNotFoundError:
+        return
+    for name in names:
+        match = PAGE_FILE.fullmatch(name)
+        if match and int(match.group(1)) > pages:
+            writer.remove(f"posts/{name}")
+
+
+def write_post_pages(writer, first_page=1, last_page=None):
+    total = _post_count()
+    pages = _page_count(total)
+    for page in range(first_page, min(last_page or pages, pages) + 1):
+        query = db.select(*columns_for(Post, SUMMARY_FIELDS)) \
+            .order_by(Post.date.asc(), Post.id.asc()).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE)
+        items = rows_to_dicts(SUMMARY_FIELDS, db.session.execute(query))
+        writer.write(f"posts/page-{page}.json", list(reversed(items)))
+    remove_pages_after(writer, pages)
+    writer.write("posts/index.json", {"total": total, "page_size": PAGE_SIZE, "pages": pages})
+
+
+def write_post(writer, slug):
+    post = db.session.execute(db.select(*columns_for(Post, Post.api_fields)).filter_by(slug=slug)).first()
+    if post:
+        writer.write(f"posts/slug/{_filename(slug)}", row_to_dict(Post.api_fields, post))
+    else:
+        writer.remove(f"posts/slug/{_filename(slug)}")
+
+
+def write_category(writer, category):
+    items = _summaries(Post.category == category)
+    if items:
+        writer.write(f"categories/{_filename(category)}", items)
+    else:
+        writer.remove(f"categories/{_filename(category)}")
+
+
+def write_categories_index(writer):
+    writer.write("categories/index.json", [facet.serialize() for facet in FacetCount.listing("category")])
+
+
+def write_journal_year(writer, year):
+    fields = Journal.api_fields
+    query = db.select(*columns_for(Journal, fields)).filter_by(year=year) \
+        .order_by(Journal.number.desc(), Journal.id.desc())
+    items = rows_to_dicts(fields, db.session.execute(query))
+    if items:
+        writer.write(f"journals/{_filename(year)}", items)
+    else:
+        writer.remove(f"journals/{_filename(year)}")
+
+
+def write_journals_index(writer):
+    query = db.select(Journal.year, db.func.count(Journal.id)) \
+        .group_by(Journal.year).order_by(Journal.year.desc())
+    years = [{"year": year, "count": count} for year, count in db.session.execute(query)]
+    writer.write("journals/index.json", years)
+
+
+def export_all(root):
+    writer = SnapshotWriter(root)
+    write_post_pages(writer)
+    # Los slugs se cargan completos antes de empezar: write_post consulta la misma sesión, y con un cursor
+    # del lado del servidor (SSCursor en MySQL) esas consultas descartarían las filas todavía sin leer
+    slugs = db.session.scalars(db.select(Post.slug).order_by(Post.id)).all()
+    for slug in slugs:
+        write_post(writer, slug)
+    for category in db.session.scalars(db.select(Post.category).distinct()):
+        write_category(writer, category)
+    write_categories_index(writer)
+    for year in db.session.scalars(db.select(Journal.year).distinct()):
+        write_journal_year(writer, year)
+    write_journals_index(writer)
+    writer.prune()
+    return len(writer.written)
+
+
+# Clave de un post para el export incremental; se toma antes y después del cambio
+def post_key(post):
+    return {"id": post.id, "slug": post.slug, "category": post.category, "date": post.date}
+
+
+# Export incremental tras crear/editar/borrar un post: solo reescribe el archivo del post, las
+# categorías afectadas y las páginas del índice desde la posición del post en adelante.
+# Una edición no mueve el post (la fecha no cambia), así que basta con su página
+def export_post_change(root, before=None, after=None):
+    writer = SnapshotWriter(root)
+    keys = [key for key in (before, after) if key]
+
+    first_page = min(_page_of(key["date"], key["id"]) for key in keys)
+    moved = not (before and after and before["date"] == after["date"])
+    write_post_pages(writer, first_page, None if moved else first_page)
+
+    for slug in {key["slug"] for key in keys}:
+        write_post(writer, slug)
+    for category in {key["category"] for key in keys}:
+        write_category(writer, category)
+    write_categories_index(writer)
+    return len(writer.written)
+
+
+def export_journal_change(root, years):
+    writer = SnapshotWriter(root)
+    for year in set(years):
+        write_journal_year(writer, year)
+    write_journals_index(writer)
+    return len(writer.written)
+
+
+# Llamados desde las rutas de escritura después del commit: el export corre en la cola de jobs.
+# Sin STATIC_EXPORT_DIR no se encola nada
+def post_changed(before=None, after=None):
+    if current_app.config.get("STATIC_EXPORT_DIR"):
+        jobs.enqueue("snapshot.post", before=before, after=after)
+
+
+def journal_changed(*years):
+    if current_app.config.get("STATIC_EXPORT_DIR"):
+        jobs.enqueue("snapshot.journal", years=[year for year in years if year is not None])
+
+
+# Después de una importación masiva conviene regenerar todo una vez antes que encolar un cambio por post
+def posts_rebuilt():
+    if current_app.config.get("STATIC_EXPORT_DIR"):
+        jobs.enqueue("snapshot.all")
+
+
+# Las claves llegan desde la cola como JSON, con la fecha en ISO 8601
+def _parse_key(key):
+    return dict(key, date=datetime.fromisoformat(key["date"])) if key else None
+
+
+@jobs.task("snapshot.post")
+def post_change_job(before=None, after=None):
+    export_post_change(current_app.config["STATIC_EXPORT_DIR"], _parse_key(before), _parse_key(after))
+
+
+@jobs.task("snapshot.journal")
+def journal_change_job(years):
+    export_journal_change(current_app.config["STATIC_EXPORT_DIR"], years)
+
+
+@jobs.task("snapshot.all")
+def export_all_job():
+    export_all(current_app.config["STATIC_EXPORT_DIR"])
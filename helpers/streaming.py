@@ -0,0 +1,63 @@
+import itertools
+from flask import Response, request, stream_with_context
+from database.db import db
+from helpers.pagination import after_cursor, parse_limit
+from helpers.serialization import columns_for, json_dumps, row_to_dict
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+STREAM_MAX_LIMIT = 100000
+
+
+# "ndjson" si el cliente lo pide por Accept, "json" para ?stream=1 (array JSON enviado por partes)
+def requested_stream():
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        return "ndjson"
+    if request.args.get("stream") in ("1", "true"):
+        return "json"
+    return None
+
+
+# Sin "limit" se envía el listado completo; si viene, debe ser un entero positivo (hasta STREAM_MAX_LIMIT)
+def parse_stream_limit(value):
+    if value is None:
+        return None
+    return parse_limit(value, maximum=STREAM_MAX_LIMIT)
+
+
+# Recorre la consulta con un cursor del lado del servidor (stream_results + yield_per) sobre tuplas
+# de columnas, sin instancias ORM, y envía cada lote apenas se serializa: la memoria por petición
+# queda acotada a STREAM_BATCH_SIZE filas sin importar el tamaño de la tabla
+def stream_rows(model, fields, conditions=(), cursor=None, limit=None, fmt="ndjson"):
+    query = db.select(*columns_for(model, fields)) \
+        .where(*conditions).order_by(model.date.desc(), model.id.desc())
+    if cursor:
+        query = query.where(after_cursor(model, cursor))
+    if limit:
+        query = query.limit(limit)
+    query = query.execution_options(stream_results=True, yield_per=STREAM_BATCH_SIZE)
+
+    # La consulta y el primer lote se ejecutan antes de devolver la respuesta, todavía dentro de la vista:
+    # así un fallo de la réplica lo atrapa replicas.read_only y se reintenta en la primaria. Un error en
+    # los lotes siguientes ocurre ya durante el envío y solo corta la respuesta
+    batches = db.session.execute(query).partitions()
+    first_batch = next(batches, [])
+
+    def generate():
+        first = True
+        if fmt == "json":
+            yield b"["
+        for rows in itertools.chain([first_batch], batches):
+            if not rows:
+                continue
+            encoded = [json_dumps(row_to_dict(fields, row)) for row in rows]
+            if fmt == "ndjson":
+                yield b"\n".join(encoded) + b"\n"
+            else:
+                yield (b"" if first else b",") + b",".join(encoded)
+            first = False
+        if fmt == "json":
+            yield b"]"
+
+    mimetype = NDJSON_MIMETYPE if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,36 @@
+"""tabla content_version para ETag y Last-Modified
+
+Revision ID: 3f1c9a7d2b44
+Revises: 269736797e7e
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from datetime import datetime, timezone
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c9a7d2b44'
+down_revision = '269736797e7e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    content_version = op.create_table(
+        'content_version',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.now(timezone.utc)
+    op.bulk_insert(content_version, [
+        {'name': 'posts', 'version': 1, 'updated_at': now},
+        {'name': 'journals', 'version': 1, 'updated_at': now},
+    ])
+
+
+def downgrade():
+    op.drop_table('content_version')
@@ -0,0 +1,39 @@
+"""conteos materializados por categoría y autor
+
+Revision ID: 5d08b3e6a9c2
+Revises: e7a9f2c4d813
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d08b3e6a9c2'
+down_revision = 'e7a9f2c4d813'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    facet_count = op.create_table(
+        'facet_count',
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('value', sa.String(length=100), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'value')
+    )
+
+    # Backfill con un único GROUP BY por faceta
+    post = sa.table('post', sa.column('category', sa.String), sa.column('author', sa.String))
+    for kind in ('category', 'author'):
+        column = post.c[kind]
+        op.execute(facet_count.insert().from_select(
+            ['kind', 'value', 'count'],
+            sa.select(sa.literal(kind), column, sa.func.count()).group_by(column)
+        ))
+
+
+def downgrade():
+    op.drop_table('facet_count')
@@ -0,0 +1,32 @@
+"""excerpt precalculado en post
+
+Revision ID: 8b2e5d0c71fa
+Revises: 3f1c9a7d2b44
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e5d0c71fa'
+down_revision = '3f1c9a7d2b44'
+branch_labels = None
+depends_on = None
+
+EXCERPT_LENGTH = 250
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('excerpt', sa.String(length=EXCERPT_LENGTH), nullable=True))
+
+    # Backfill de los posts existentes
+    post = sa.table('post', sa.column('content', sa.Text), sa.column('excerpt', sa.String))
+    op.execute(post.update().values(excerpt=sa.func.substr(post.c.content, 1, EXCERPT_LENGTH)))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,32 @@
+"""variantes de imagen en post y journal
+
+Revision ID: b93d4f1e6a27
+Revises: 5d08b3e6a9c2
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b93d4f1e6a27'
+down_revision = '5d08b3e6a9c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_variants', sa.JSON(), nullable=True))
+
+    with op.batch_alter_table('journal', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('image_variants', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('journal', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('image_variants')
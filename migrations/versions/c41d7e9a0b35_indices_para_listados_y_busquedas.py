@@ -0,0 +1,37 @@
+"""índices para listados y búsquedas
+
+Revision ID: c41d7e9a0b35
+Revises: 8b2e5d0c71fa
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a0b35'
+down_revision = '8b2e5d0c71fa'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.create_index('ix_post_date_id', ['date', 'id'], unique=False)
+        batch_op.create_index('ix_post_category_date', ['category', 'date'], unique=False)
+        batch_op.create_index('ix_post_author_date', ['author', 'date'], unique=False)
+
+    with op.batch_alter_table('journal', schema=None) as batch_op:
+        batch_op.create_index('ix_journal_date_id', ['date', 'id'], unique=False)
+        batch_op.create_index('ix_journal_year_number', ['year', 'number'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('journal', schema=None) as batch_op:
+        batch_op.drop_index('ix_journal_year_number')
+        batch_op.drop_index('ix_journal_date_id')
+
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_index('ix_post_author_date')
+        batch_op.drop_index('ix_post_category_date')
+        batch_op.drop_index('ix_post_date_id')
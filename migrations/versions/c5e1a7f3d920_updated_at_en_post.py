@@ -0,0 +1,30 @@
+"""fecha de última modificación en post
+
+Revision ID: c5e1a7f3d920
+Revises: b93d4f1e6a27
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e1a7f3d920'
+down_revision = 'b93d4f1e6a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # Backfill: sin historial, la última modificación es la fecha de publicación
+    post = sa.table('post', sa.column('date', sa.DateTime), sa.column('updated_at', sa.DateTime))
+    op.execute(post.update().values(updated_at=post.c.date))
+
+
+def downgrade():
+    with op.batch_alter_table('post', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
@@ -0,0 +1,27 @@
+"""índice FULLTEXT en post para la búsqueda
+
+Revision ID: e7a9f2c4d813
+Revises: c41d7e9a0b35
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7a9f2c4d813'
+down_revision = 'c41d7e9a0b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Solo MySQL/MariaDB; en otros motores la búsqueda usa LIKE
+    if op.get_bind().dialect.name == 'mysql':
+        op.create_index('ix_post_fulltext', 'post', ['title', 'content'],
+                        unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ix_post_fulltext', table_name='post')
@@ -0,0 +1,223 @@
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+from database.config import ASYNC_DATABASE_URI, async_engine_options
+from database.models import ContentVersion, FacetCount, Journal, Post
+from helpers.batch import BatchError, batch_statement, order_batch, parse_batch
+from helpers.conditional import API_CACHE_CONTROL
+from helpers.pagination import PaginationError, keyset_query, parse_fields, parse_limit, split_page
+from helpers.search import SearchError, parse_query, search_statement, serialize_result
+from helpers.serialization import columns_for, json_dumps, row_to_dict, rows_to_dicts
+
+
+class ApiRequest:
+    def __init__(self, scope):
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.query_string = scope["query_string"].decode("latin-1")
+        self.args = dict(parse_qsl(self.query_string))
+        self.headers = {name.decode("latin-1").lower(): value.decode("latin-1")
+                        for name, value in scope["headers"]}
+        self.scheme = scope.get("scheme", "http")
+
+    def url_with(self, **args):
+        host = self.headers.get("host", "localhost")
+        return f"{self.scheme}://{host}{self.path}?{urlencode({**self.args, **args})}"
+
+
+class ApiResponse:
+    def __init__(self, data=None, status=200, headers=None):
+        self.body = json_dumps(data) if data is not None else b""
+        self.status = status
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+
+def _error(message, status):
+    return ApiResponse({"error": message}, status)
+
+
+# Versión de las tablas de contenido para el ETag, la misma que usan las rutas de escritura
+async def _versions(connection, names):
+    query = select(ContentVersion.name, ContentVersion.version).where(ContentVersion.name.in_(names))
+    versions = dict((await connection.execute(query)).all())
+    return [f"{name}:{versions.get(name, 0)}" for name in names]
+
+
+async def _paginated_list(request, connection, model, filters=()):
+    conditions = [getattr(model, name) == request.args[name] for name in filters if request.args.get(name)]
+    try:
+        fields = parse_fields(request.args.get("fields"), model)
+        limit = parse_limit(request.args.get("limit"))
+        query = select(*columns_for(model, fields, with_cursor=True)).where(*conditions)
+        query = keyset_query(query, model, request.args.get("cursor"), limit)
+    except PaginationError as e:
+        return _error(str(e), 400)
+
+    rows, next_cursor = split_page((await connection.execute(query)).all(), limit)
+    headers = {}
+    if next_cursor:
+        headers["Link"] = f'<{request.url_with(cursor=next_cursor)}>; rel="next"'
+        headers["X-Next-Cursor"] = next_cursor
+    return ApiResponse(rows_to_dicts(fields, rows), headers=headers)
+
+
+async def _single(connection, model, message, **filters):
+    query = select(*columns_for(model, model.api_fields)).filter_by(**filters)
+    row = (await connection.execute(query)).first()
+    if row:
+        return ApiResponse(row_to_dict(model.api_fields, row))
+    return _error(message, 404)
+
+
+async def get_posts(request, connection):
+    return await _paginated_list(request, connection, Post, filters=("category", "author"))
+
+
+async def get_post(request, connection, post_id):
+    return await _single(connection, Post, "Post not found", id=int(post_id))
+
+
+async def get_post_by_slug(request, connection, slug):
+    return await _single(connection, Post, "Post not found", slug=slug)
+
+
+async def _batch_list(request, connection, model, columns):
+    try:
+        fields = parse_fields(request.args.get("fields"), model)
+        keys = parse_batch(request.args, columns)
+    except (PaginationError, BatchError) as e:
+        return _error(str(e), 400)
+    names, query = batch_statement(model, fields, keys)
+    return ApiResponse(order_batch(fields, names, (await connection.execute(query)).all(), keys))
+
+
+async def get_posts_batch(request, connection):
+    return await _batch_list(request, connection, Post, ("id", "slug"))
+
+
+async def search_posts_endpoint(request, connection):
+    try:
+        stems = parse_query(request.args.get("q"))
+        limit = parse_limit(request.args.get("limit"))
+    except (SearchError, PaginationError) as e:
+        return _error(str(e), 400)
+    page = int(request.args["page"]) if request.args.get("page", "").isdigit() else 1
+    page = max(page, 1)
+
+    query = search_statement(stems, limit + 1, (page - 1) * limit, connection.dialect.name)
+    rows = (await connection.execute(query)).all()
+    headers = {}
+    if len(rows) > limit:
+        headers["Link"] = f'<{request.url_with(page=page + 1)}>; rel="next"'
+    return ApiResponse([serialize_result(row, stems) for row in rows[:limit]], headers=headers)
+
+
+async def _facets(connection, kind):
+    query = select(FacetCount.value, FacetCount.count).filter_by(kind=kind) \
+        .order_by(FacetCount.count.desc(), FacetCount.value)
+    return ApiResponse([{"name": value, "count": count} for value, count in await connection.execute(query)])
+
+
+async def get_categories(request, connection):
+    return await _facets(connection, "category")
+
+
+async def get_authors(request, connection):
+    return await _facets(connection, "author")
+
+
+async def get_journals(request, connection):
+    return await _paginated_list(request, connection, Journal)
+
+
+async def get_journals_batch(request, connection):
+    return await _batch_list(request, connection, Journal, ("id",))
+
+
+async def get_journal(request, connection, journal_id):
+    return await _single(connection, Journal, "Journal not found", id=int(journal_id))
+
+
+# Mismas rutas y respuestas que las de /api/* en routes/endpoints.py (sin streaming ni réplicas)
+ROUTES = [
+    (re.compile(r"/api/posts"), ("posts",), get_posts),
+    (re.compile(r"/api/posts/batch"), ("posts",), get_posts_batch),
+    (re.compile(r"/api/posts/search"), ("posts",), search_posts_endpoint),
+    (re.compile(r"/api/posts/slug/(?P<slug>[^/]+)"), ("posts",), get_post_by_slug),
+    (re.compile(r"/api/posts/(?P<post_id>\d+)"), ("posts",), get_post),
+    (re.compile(r"/api/categories"), ("posts",), get_categories),
+    (re.compile(r"/api/authors"), ("posts",), get_authors),
+    (re.compile(r"/api/journals"), ("journals",), get_journals),
+    (re.compile(r"/api/journals/batch"), ("journals",), get_journals_batch),
+    (re.compile(r"/api/journals/(?P<journal_id>\d+)"), ("journals",), get_journal),
+]
+
+
+# App ASGI mínima para servir la API pública de lectura con un motor SQLAlchemy asíncrono:
+# mientras una consulta espera a la base, el mismo proceso atiende otras peticiones.
+# Se levanta aparte de la app Flask (ver asgi.py); las rutas de admin siguen en los workers síncronos
+class AsyncApi:
+    def __init__(self, uri=ASYNC_DATABASE_URI):
+        self.uri = uri
+        self.engine = None
+
+    # El motor se crea dentro del event loop del worker, nunca antes del fork
+    def get_engine(self):
+        if self.engine is None:
+            self.engine = create_async_engine(self.uri, **async_engine_options(self.uri))
+        return self.engine
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+        elif scope["type"] == "http":
+            request = ApiRequest(scope)
+            response = await self.dispatch(request)
+            headers = [(name.encode("latin-1"), value.encode("latin-1"))
+                       for name, value in response.headers.items()]
+            headers.append((b"content-length", str(len(response.body)).encode()))
+            await send({"type": "http.response.start", "status": response.status, "headers": headers})
+            body = response.body if request.method != "HEAD" else b""
+            await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.get_engine()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if self.engine is not None:
+                    await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def dispatch(self, request):
+        for pattern, names, handler in ROUTES:
+            match = pattern.fullmatch(request.path)
+            if match:
+                break
+        else:
+            return _error("Not found", 404)
+        if request.method not in ("GET", "HEAD"):
+            return _error("Method not allowed", 405)
+
+        try:
+            async with self.get_engine().connect() as connection:
+                versions = await _versions(connection, names)
+                etag = hashlib.sha1("|".join([f"{request.path}?{request.query_string}"] + versions)
+                                    .encode()).hexdigest()
+                if f'"{etag}"' in request.headers.get("if-none-match", ""):
+                    response = ApiResponse(status=304)
+                else:
+                    response = await handler(request, connection, **match.groupdict())
+        except OperationalError:
+            return _error("Database unavailable", 503)
+
+        if response.status in (200, 304):
+            response.headers["ETag"] = f'"{etag}"'
+            response.headers["Cache-Control"] = API_CACHE_CONTROL
+        return response
@@ -0,0 +1,123 @@
+import json
+import time
+from concurrent.futures import wait
+import click
+from flask import Flask
+from database.db import db
+from database.models import Journal, Post
+from helpers.assets import assets
+from helpers.bulk import BULK_KINDS, BULK_MODES, BulkError, BulkImporter, export_records
+from helpers.images import images
+from helpers.jobs import jobs
+from helpers.snapshot import export_all
+
+
+def init_app(app: Flask):
+
+    # Crea las tablas en una base nueva (solo la primaria: las réplicas las reciben por replicación).
+    # Las bases existentes se actualizan con "flask db upgrade"
+    @app.cli.command("create-schema")
+    def create_schema():
+        db.create_all(bind_key=None)
+        click.echo(f"Schema created on {db.engine.url.render_as_string(hide_password=True)}")
+
+    # Exporta posts y journals como JSON estático para servirlos desde nginx o un CDN
+    @app.cli.command("export-static")
+    @click.option("--output", "-o", help="Directorio de salida (por defecto STATIC_EXPORT_DIR)")
+    def export_static(output):
+        output = output or app.config.get("STATIC_EXPORT_DIR")
+        if not output:
+            raise click.UsageError("Set STATIC_EXPORT_DIR or pass --output")
+        start = time.perf_counter()
+        written = export_all(output)
+        click.echo(f"{written} files written to {output} in {time.perf_counter() - start:.1f} s")
+
+    # Genera las variantes de las imágenes que todavía no las tienen (o todas con --force) en el pool
+    @app.cli.command("build-images")
+    @click.option("--force", is_flag=True, help="Regenera también las que ya tienen variantes")
+    def build_images(force):
+        start = time.perf_counter()
+        pending = []
+        for model in (Post, Journal):
+            query = db.select(model.id, model.image, model.image_variants).where(model.image.isnot(None))
+            for record_id, url, variants in db.session.execute(query).all():
+                if url and (force or not variants or variants.get("source") != url):
+                    pending.append((model, record_id, url))
+        # Sin transacción abierta mientras los threads del pool escriben
+        db.session.close()
+        wait([images.submit(*job) for job in pending])
+        click.echo(f"{len(pending)} images processed in {time.perf_counter() - start:.1f} s")
+
+    # Publica static/ y public/ con hash en el nombre y versiones .gz/.br en ASSETS_DIR
+    @app.cli.command("build-assets")
+    def build_assets():
+        start = time.perf_counter()
+        manifest = assets.build()
+        click.echo(f"{len(manifest)} assets written to {assets.directory} "
+                   f"in {time.perf_counter() - start:.1f} s")
+
+    # Cola de trabajos: "flask jobs work" corre un worker dedicado (para JOB_WORKERS=0),
+    # "flask jobs run" ejecuta lo pendiente y termina, "flask jobs status" muestra los conteos
+    @app.cli.group("jobs")
+    def jobs_group():
+        pass
+
+    @jobs_group.command("work")
+    @click.option("--threads", default=1, show_default=True)
+    def jobs_work(threads):
+        jobs.workers = threads
+        jobs.start()
+        click.echo(f"Working on {jobs.path} with {threads} thread(s)")
+        while True:
+            time.sleep(3600)
+
+    @jobs_group.command("run")
+    def jobs_run():
+        click.echo(f"{jobs.run_pending()} jobs executed")
+
+    @jobs_group.command("status")
+    def jobs_status():
+        for status, count in jobs.counts().items():
+            click.echo(f"{status:8} {count}")
+        for job in jobs.recent(limit=10, status="failed"):
+            error = (job['error'] or '').strip()
+            click.echo(f"failed #{job['id']} {job['name']}: {error.splitlines()[-1] if error else ''}")
+
+    @jobs_group.command("purge")
+    @click.option("--days", default=7, show_default=True)
+    def jobs_purge(days):
+        click.echo(f"{jobs.purge(days * 86400)} finished jobs deleted")
+
+    # Importación y exportación masiva en NDJSON: "flask bulk import posts.ndjson --kind posts"
+    # y "flask bulk export -k journals journals.ndjson" (sin archivo, stdin/stdout)
+    @app.cli.group("bulk")
+    def bulk_group():
+        pass
+
+    @bulk_group.command("import")
+    @click.argument("source", type=click.File("rb"), default="-")
+    @click.option("--kind", "-k", type=click.Choice(BULK_KINDS), default="posts", show_default=True)
+    @click.option("--mode", type=click.Choice(BULK_MODES), default="insert", show_default=True,
+                  help="upsert actualiza los posts con el mismo slug y los journals con el mismo id")
+    @click.option("--chunk-size", type=int, help="Registros por transacción (por defecto BULK_CHUNK_SIZE)")
+    @click.option("--dry-run", is_flag=True, help="Solo valida, no escribe")
+    def bulk_import(source, kind, mode, chunk_size, dry_run):
+        start = time.perf_counter()
+        try:
+            importer = BulkImporter(kind, mode, chunk_size or app.config["BULK_CHUNK_SIZE"], dry_run)
+        except BulkError as e:
+            raise click.UsageError(str(e))
+        report = importer.run(source)
+        for error in report["errors"]:
+            click.echo(json.dumps(error, ensure_ascii=False), err=True)
+        click.echo(f"{report['received']} received, {report['inserted']} inserted, "
+                   f"{report['updated']} updated, {report['skipped']} skipped "
+                   f"in {time.perf_counter() - start:.1f} s"
+                   + (" (dry run)" if dry_run else ""))
+
+    @bulk_group.command("export")
+    @click.argument("output", type=click.File("wb"), default="-")
+    @click.option("--kind", "-k", type=click.Choice(BULK_KINDS), default="posts", show_default=True)
+    def bulk_export(output, kind):
+        for data in export_records(kind):
+            output.write(data)
@@ -1,24 +1,60 @@
-from flask import Flask, render_template, redirect, url_for, flash, jsonify, request
-from flask_login import login_user, logout_user, login_required, LoginManager
+from flask import (Flask, Response, render_template, redirect, url_for, flash, jsonify, request, session,
+                   stream_with_context)
+from flask_login import login_user, logout_user, login_required, LoginManager, current_user
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import load_only
 from helpers.forms import LoginForm, PostForm, JournalForm
-from database.models import Admin, Post, Journal
+from helpers.admin_cache import forget_login, load_admin, remember_login
+from database.models import Admin, Post, Journal, ContentVersion, FacetCount
 from database.db import db
+from database.pool import pool_stats
+from database.routing import replicas
+from helpers.batch import BatchError, batch_statement, order_batch, parse_batch
+from helpers.bulk import BulkError, BulkImporter, export_records
+from helpers.cache import api_cache
+from helpers.images import images
+from helpers.jobs import JOB_STATUSES, jobs
+from helpers.conditional import conditional, PAGE_CACHE_CONTROL
+from helpers.feeds import ATOM_MIMETYPE, RSS_MIMETYPE, SITEMAP_MIMETYPE, feeds, site_url
+from helpers.pagination import (PaginationError, admin_page, cached_total, keyset_page, parse_fields,
+                                parse_limit, project)
+from helpers.search import SearchError, parse_query, search_posts, serialize_result
+from helpers.serialization import columns_for, json_response, row_to_dict, rows_to_dicts
+from helpers.snapshot import journal_changed, post_changed, post_key
+from helpers.streaming import NDJSON_MIMETYPE, parse_stream_limit, requested_stream, stream_rows
 
 login_manager = LoginManager()
 
+HOME_LATEST = 3
+
 
 def init_app(app: Flask):
 
     login_manager.init_app(app)
 
-    # Página de inicio, muestra todos los posts
+    # El HTML depende del usuario; con mensajes flash pendientes no se revalida
+    def home_page_variant():
+        return current_user.get_id() or 'anonymous'
+
+    def has_flashes():
+        return '_flashes' in session
+
+    # Página de inicio, muestra los últimos posts y journals (sin cargar el contenido completo)
     @app.route("/")
     @app.route("/index")
     @app.route("/home")
+    @conditional('posts', 'journals', cache_control=PAGE_CACHE_CONTROL,
+                 vary=home_page_variant, unless=has_flashes)
     def home_page():
-        posts = Post.query.order_by(Post.date.desc()).all()
-        journals = Journal.query.order_by(Journal.date.desc()).all()
-        return render_template('index.html', posts=posts, journals=journals)
+        columns = (Post.id, Post.author, Post.title, Post.image, Post.image_variants, Post.excerpt)
+        posts = Post.query.options(load_only(*columns)) \
+            .order_by(Post.date.desc(), Post.id.desc()).limit(HOME_LATEST).all()
+        journals = Journal.query.order_by(Journal.date.desc(), Journal.id.desc()).limit(HOME_LATEST).all()
+        # Los totales solo se recuentan después de una escritura (ver cached_total)
+        post_count = cached_total(Post)
+        journal_count = cached_total(Journal)
+        return render_template('index.html', posts=posts, journals=journals,
+                               post_count=post_count, journal_count=journal_count)
 
     # Página de inicio de sesión, maneja el login de administradores
     @app.route("/login", methods=['GET', 'POST'])
@@ -28,6 +64,7 @@ def init_app(app: Flask):
             attempted_user = Admin.query.filter_by(name=form.name.data).first()
             if attempted_user and attempted_user.check_password(password_attempt=form.password.data):
                 login_user(attempted_user)
+                remember_login(attempted_user)
                 flash(f'You are logged in as: {attempted_user.name}', category='success')
                 return redirect(url_for('home_page'))
             else:
@@ -37,10 +74,36 @@ def init_app(app: Flask):
     # Maneja el cierre de sesión de administradores
     @app.route("/logout")
     def logout_page():
+        forget_login(current_user.get_id())
         logout_user()
         flash('You are now Logged Out, See you soon!', category='info')
         return redirect(url_for('home_page'))
 
+    # Un archivo subido se guarda en IMAGE_DIR y reemplaza a la URL de la imagen
+    def uploaded_image(form):
+        if form.image_file.data:
+            form.image.data = images.store_upload(form.image_file.data.read())
+
+    # Genera las variantes en segundo plano si la imagen cambió o todavía no las tiene
+    def schedule_image(record, previous=None):
+        if record.image != previous or not record.image_variants:
+            images.schedule(type(record), record.id, record.image)
+
+    # Listados del admin con paginación por clave (?after=, ?before=, ?date=YYYY-MM-DD): cada página
+    # cuesta lo mismo sin importar la profundidad y el total sale de un conteo cacheado por versión
+    admin_columns = {Post: ('id', 'author', 'title', 'date'),
+                     Journal: ('id', 'number', 'title', 'year', 'date')}
+
+    def admin_list(model, template, name):
+        query = model.query.options(load_only(*[getattr(model, column) for column in admin_columns[model]]))
+        try:
+            page = admin_page(query, model, after=request.args.get('after'),
+                              before=request.args.get('before'), date=request.args.get('date'))
+        except PaginationError as e:
+            flash(str(e), category='danger')
+            page = admin_page(query, model)
+        return render_template(template, **{name: page}, endpoint=request.endpoint)
+
     # Página para crear un nuevo post
     @app.route("/admin/create", methods=['GET', 'POST'])
     @login_required
@@ -48,6 +111,7 @@ def init_app(app: Flask):
         form = PostForm()
         if form.validate_on_submit():
             try:
+                uploaded_image(form)
                 new_post = Post(
                     author=form.author.data,
                     title=form.title.data,
@@ -57,7 +121,11 @@ def init_app(app: Flask):
                     content=form.content.data
                 )
                 db.session.add(new_post)
+                FacetCount.update_post(after=new_post.facets())
+                ContentVersion.bump('posts')
                 db.session.commit()
+                post_changed(after=post_key(new_post))
+                schedule_image(new_post)
                 flash('Post created successfully', category='success')
                 return redirect(url_for('create_post'))
             except Exception as e:
@@ -75,9 +143,7 @@ def init_app(app: Flask):
     @app.route("/admin/erase", methods=['GET', 'POST'])
     @login_required
     def erase_post():
-        page = request.args.get('page', 1, type=int)
-        posts = Post.query.order_by(Post.date.desc()).paginate(page=page, per_page=20)
-        return render_template('erase-post.html', posts=posts)
+        return admin_list(Post, 'erase-post.html', 'posts')
 
     # Endpoint para eliminar un post
     @app.route("/admin/delete_post/<int:post_id>", methods=['POST'])
@@ -85,8 +151,12 @@ def init_app(app: Flask):
     def delete_post(post_id):
         post = Post.query.get(post_id)
         if post:
+            key = post_key(post)
             db.session.delete(post)
+            FacetCount.update_post(before=post.facets())
+            ContentVersion.bump('posts')
             db.session.commit()
+            post_changed(before=key)
             flash('Post deleted successfully', category='success')
         else:
             flash('Post not found', category='error')
@@ -96,9 +166,7 @@ def init_app(app: Flask):
     @app.route("/admin/edit", methods=['GET'])
     @login_required
     def edit_post():
-        page = request.args.get('page', 1, type=int)
-        posts = Post.query.order_by(Post.date.desc()).paginate(page=page, per_page=20)
-        return render_template('edit-post.html', posts=posts)
+        return admin_list(Post, 'edit-post.html', 'posts')
 
     # Página para editar un post
     @app.route("/admin/mod_post/<int:post_id>", methods=['GET', 'POST'])
@@ -116,13 +184,21 @@ def init_app(app: Flask):
             if existing_post and existing_post.id != post.id:
                 flash('Slug must be unique. This slug is already in use.', category='error')
             else:
+                before = post.facets()
+                key = post_key(post)
+                previous_image = post.image
+                uploaded_image(form)
                 post.author = form.author.data
                 post.title = form.title.data
                 post.category = form.category.data
                 post.slug = form.slug.data
                 post.image = form.image.data
                 post.content = form.content.data
+                FacetCount.update_post(before, post.facets())
+                ContentVersion.bump('posts')
                 db.session.commit()
+                post_changed(key, post_key(post))
+                schedule_image(post, previous_image)
                 flash('Post updated successfully', category='success')
                 return redirect(url_for('edit_post'))
 
@@ -135,6 +211,7 @@ def init_app(app: Flask):
         form = JournalForm()
         if form.validate_on_submit():
             try:
+                uploaded_image(form)
                 new_journal = Journal(
                     date=form.date.data,
                     number=form.number.data,
@@ -144,7 +221,10 @@ def init_app(app: Flask):
                     image=form.image.data
                 )
                 db.session.add(new_journal)
+                ContentVersion.bump('journals')
                 db.session.commit()
+                journal_changed(new_journal.year)
+                schedule_image(new_journal)
                 flash('Journal created successfully', category='success')
                 return redirect(url_for('create_journal'))
             except Exception as e:
@@ -162,9 +242,7 @@ def init_app(app: Flask):
     @app.route("/admin/erase-journal", methods=['GET', 'POST'])
     @login_required
     def erase_journal():
-        page = request.args.get('page', 1, type=int)
-        journals = Journal.query.order_by(Journal.date.desc()).paginate(page=page, per_page=20)
-        return render_template('erase-journal.html', journals=journals)
+        return admin_list(Journal, 'erase-journal.html', 'journals')
 
     # Endpoint para eliminar un journal
     @app.route("/admin/delete_journal/<int:journal_id>", methods=['POST'])
@@ -172,8 +250,11 @@ def init_app(app: Flask):
     def delete_journal(journal_id):
         journal = Journal.query.get(journal_id)
         if journal:
+            year = journal.year
             db.session.delete(journal)
+            ContentVersion.bump('journals')
             db.session.commit()
+            journal_changed(year)
             flash('Journal deleted successfully', category='success')
         else:
             flash('Journal not found', category='error')
@@ -183,9 +264,7 @@ def init_app(app: Flask):
     @app.route("/admin/edit-journal", methods=['GET'])
     @login_required
     def edit_journal():
-        page = request.args.get('page', 1, type=int)
-        journals = Journal.query.order_by(Journal.date.desc()).paginate(page=page, per_page=20)
-        return render_template('edit-journal.html', journals=journals)
+        return admin_list(Journal, 'edit-journal.html', 'journals')
 
     # Página para modificar un journal existente
     @app.route("/admin/mod_journal/<int:journal_id>", methods=['GET', 'POST'])
@@ -198,67 +277,267 @@ def init_app(app: Flask):
 
         form = JournalForm(obj=journal)
         if form.validate_on_submit():
+            year = journal.year
+            previous_image = journal.image
+            uploaded_image(form)
             journal.date = form.date.data
             journal.number = form.number.data
             journal.year = form.year.data
             journal.title = form.title.data
             journal.url = form.url.data
             journal.image = form.image.data
+            ContentVersion.bump('journals')
             db.session.commit()
+            journal_changed(year, journal.year)
+            schedule_image(journal, previous_image)
             flash('Journal updated successfully', category='success')
             return redirect(url_for('edit_journal'))
 
         return render_template('mod-journal.html', form=form, journal=journal)
 
+    # Importación y exportación masiva en NDJSON (?kind=posts|journals). POST importa el cuerpo
+    # (&mode=insert|upsert&chunk_size=&dry_run=1, con Content-Type: application/x-ndjson y la cabecera
+    # X-Requested-With) y devuelve un resumen; GET exporta todo en streaming
+    @app.route("/api/admin/bulk", methods=['GET', 'POST'])
+    @login_required
+    def bulk():
+        kind = request.args.get('kind', 'posts')
+        try:
+            if request.method == 'GET':
+                return Response(stream_with_context(export_records(kind)), mimetype=NDJSON_MIMETYPE)
+            # Protección CSRF: un formulario de otro sitio envía la cookie de sesión pero no puede poner este
+            # Content-Type ni cabeceras propias sin un preflight CORS, que nunca se concede
+            if request.mimetype != NDJSON_MIMETYPE:
+                return jsonify({"error": f"Content-Type must be {NDJSON_MIMETYPE}"}), 415
+            if not request.headers.get('X-Requested-With'):
+                return jsonify({"error": "X-Requested-With header is required"}), 400
+            importer = BulkImporter(kind, request.args.get('mode', 'insert'),
+                                    request.args.get('chunk_size', app.config['BULK_CHUNK_SIZE'], type=int),
+                                    dry_run=request.args.get('dry_run') in ('1', 'true'))
+        except BulkError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(importer.run(request.stream))
+
+    # Estado de la cola de trabajos en segundo plano (?status=queued|running|done|failed)
+    @app.route("/admin/jobs", methods=['GET'])
+    @login_required
+    def jobs_status():
+        status = request.args.get('status')
+        if status not in JOB_STATUSES:
+            status = None
+        return render_template('jobs.html', counts=jobs.counts(), jobs=jobs.recent(status=status),
+                               status=status)
+
+    # Vuelve a encolar un trabajo fallido
+    @app.route("/admin/jobs/<int:job_id>/retry", methods=['POST'])
+    @login_required
+    def retry_job(job_id):
+        if jobs.retry(job_id):
+            flash('Job queued again', category='success')
+        else:
+            flash('Job not found or not failed', category='error')
+        return redirect(url_for('jobs_status', status='failed'))
+
+    # Estado de la base de datos, de las réplicas y métricas de los pools de conexiones de este worker
+    @app.route("/health/db", methods=['GET'])
+    def db_health():
+        try:
+            db.session.execute(db.text("SELECT 1"))
+            status = "ok"
+        except SQLAlchemyError:
+            db.session.rollback()
+            status = "error"
+        replica_status = replicas.status()
+        return jsonify({
+            "status": status,
+            "pool": pool_stats(db.engine),
+            "replicas": {name: {"status": replica_status[name], "pool": pool_stats(db.engines[name])}
+                         for name in replicas.names},
+        }), 200 if status == "ok" else 503
+
     # Maneja el error 404
     @app.errorhandler(404)
     def not_found(e):
         return render_template('notfound.html')
 
-    # Carga un usuario por su ID
+    # Carga un usuario por su ID (desde la caché del worker si la versión de la sesión coincide)
     @login_manager.user_loader
     def load_user(user_id):
-        return Admin.query.get(int(user_id))
+        return load_admin(user_id)
 
     # Maneja accesos no autorizados
     @login_manager.unauthorized_handler
     def unauthorized():
         return render_template('forbidden.html')
 
-    # Endpoint API para obtener todos los posts
+    # Devuelve una página del listado; el cursor siguiente va en las cabeceras Link y X-Next-Cursor
+    # Con Accept: application/x-ndjson o ?stream=1 se envía todo el listado en streaming
+    def paginated_list(model, filters=()):
+        conditions = [getattr(model, name) == request.args[name]
+                      for name in filters if request.args.get(name)]
+        try:
+            fields = parse_fields(request.args.get('fields'), model)
+            stream = requested_stream()
+            if stream:
+                cursor, limit = request.args.get('cursor'), parse_stream_limit(request.args.get('limit'))
+                response = stream_rows(model, fields, conditions, cursor, limit, fmt=stream)
+                response.vary.add('Accept')
+                return response
+
+            limit = parse_limit(request.args.get('limit'))
+            query = project(model.query, model, fields).filter(*conditions)
+            items, next_cursor = keyset_page(query, model, request.args.get('cursor'), limit)
+        except PaginationError as e:
+            return jsonify({"error": str(e)}), 400
+
+        response = json_response(rows_to_dicts(fields, items))
+        response.vary.add('Accept')
+        if next_cursor:
+            args = request.args.to_dict()
+            args['cursor'] = next_cursor
+            next_url = url_for(request.endpoint, _external=True, **args)
+            response.headers['Link'] = f'<{next_url}>; rel="next"'
+            response.headers['X-Next-Cursor'] = next_cursor
+        return response
+
+    # Endpoint API para obtener los posts paginados (?limit=&cursor=&fields=&category=&author=)
     @app.route("/api/posts", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts', vary=requested_stream)
+    @api_cache.cached('posts', unless=requested_stream)
     def get_posts():
-        posts = Post.query.all()
-        return jsonify([post.serialize() for post in posts])
+        return paginated_list(Post, filters=('category', 'author'))
 
     # Endpoint API para obtener un post por ID
     @app.route("/api/posts/<int:post_id>", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
     def get_post(post_id):
-        post = Post.query.get(post_id)
+        query = db.select(*columns_for(Post, Post.api_fields)).filter_by(id=post_id)
+        post = db.session.execute(query).first()
         if post:
-            return jsonify(post.serialize())
+            return json_response(row_to_dict(Post.api_fields, post))
         else:
             return jsonify({"error": "Post not found"}), 404
 
+    # Varios items en una sola consulta (?ids=&fields=, y ?slugs= para posts), en el orden pedido;
+    # las claves inexistentes se informan en "missing"
+    def batch_list(model, columns):
+        try:
+            fields = parse_fields(request.args.get('fields'), model)
+            keys = parse_batch(request.args, columns)
+        except (PaginationError, BatchError) as e:
+            return jsonify({"error": str(e)}), 400
+        names, query = batch_statement(model, fields, keys)
+        return json_response(order_batch(fields, names, db.session.execute(query).all(), keys))
+
+    @app.route("/api/posts/batch", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def get_posts_batch():
+        return batch_list(Post, ('id', 'slug'))
+
+    # Búsqueda de texto completo sobre título y contenido (?q=&limit=&page=), ordenada por relevancia
+    @app.route("/api/posts/search", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def search_posts_endpoint():
+        try:
+            stems = parse_query(request.args.get('q'))
+            limit = parse_limit(request.args.get('limit'))
+        except (SearchError, PaginationError) as e:
+            return jsonify({"error": str(e)}), 400
+        page = max(request.args.get('page', 1, type=int), 1)
+
+        rows = search_posts(stems, limit + 1, (page - 1) * limit)
+        response = jsonify([serialize_result(row, stems) for row in rows[:limit]])
+        if len(rows) > limit:
+            args = request.args.to_dict()
+            args['page'] = page + 1
+            response.headers['Link'] = f'<{url_for(request.endpoint, _external=True, **args)}>; rel="next"'
+        return response
+
     @app.route("/api/posts/slug/<string:slug>", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
     def get_post_by_slug(slug):
-        post = Post.query.filter_by(slug=slug).first()
+        query = db.select(*columns_for(Post, Post.api_fields)).filter_by(slug=slug)
+        post = db.session.execute(query).first()
         if post:
-            return jsonify(post.serialize())
+            return json_response(row_to_dict(Post.api_fields, post))
         else:
             return jsonify({"error": "Post not found"}), 404
 
-    # Endpoint API para obtener todos los journals
+    # Endpoints API con las categorías y autores y la cantidad de posts de cada uno
+    @app.route("/api/categories", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def get_categories():
+        return jsonify([facet.serialize() for facet in FacetCount.listing('category')])
+
+    @app.route("/api/authors", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def get_authors():
+        return jsonify([facet.serialize() for facet in FacetCount.listing('author')])
+
+    # Feeds RSS/Atom con los últimos posts (solo el resumen salvo FEED_FULL_CONTENT) y sitemap.
+    # El XML queda en la caché de respuestas y el ETag depende de la versión de "posts"
+    @app.route("/feed.xml", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def rss_feed():
+        body = feeds.rss(site_url(), app.config['SITE_TITLE'], app.config['SITE_DESCRIPTION'],
+                         app.config['FEED_ITEMS'], app.config['FEED_FULL_CONTENT'])
+        return Response(body, mimetype=RSS_MIMETYPE)
+
+    @app.route("/atom.xml", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def atom_feed():
+        body = feeds.atom(site_url(), app.config['SITE_TITLE'], app.config['FEED_ITEMS'],
+                          app.config['FEED_FULL_CONTENT'])
+        return Response(body, mimetype=ATOM_MIMETYPE)
+
+    @app.route("/sitemap.xml", methods=['GET'])
+    @replicas.read_only
+    @conditional('posts')
+    @api_cache.cached('posts')
+    def sitemap():
+        return Response(feeds.sitemap(site_url()), mimetype=SITEMAP_MIMETYPE)
+
+    # Endpoint API para obtener los journals paginados (?limit=&cursor=&fields=)
     @app.route("/api/journals", methods=['GET'])
+    @replicas.read_only
+    @conditional('journals', vary=requested_stream)
+    @api_cache.cached('journals', unless=requested_stream)
     def get_journals():
-        journals = Journal.query.all()
-        return jsonify([journal.serialize() for journal in journals])
+        return paginated_list(Journal)
+
+    @app.route("/api/journals/batch", methods=['GET'])
+    @replicas.read_only
+    @conditional('journals')
+    @api_cache.cached('journals')
+    def get_journals_batch():
+        return batch_list(Journal, ('id',))
 
     # Endpoint API para obtener un journal por ID
     @app.route("/api/journals/<int:journal_id>", methods=['GET'])
+    @replicas.read_only
+    @conditional('journals')
+    @api_cache.cached('journals')
     def get_journal(journal_id):
-        journal = Journal.query.get(journal_id)
+        query = db.select(*columns_for(Journal, Journal.api_fields)).filter_by(id=journal_id)
+        journal = db.session.execute(query).first()
         if journal:
-            return jsonify(journal.serialize())
+            return json_response(row_to_dict(Journal.api_fields, journal))
         else:
             return jsonify({"error": "Journal not found"}), 404
@@ -1,9 +1,7 @@
-from app import app
-from database.db import db
-from database.models import  *
+from app import create_app
 
-with app.app_context():
-    db.create_all()
+# El esquema ya no se crea al arrancar: "flask create-schema" en una base nueva o "flask db upgrade"
+app = create_app()
 
 if __name__ == "__main__":
     app.run(debug=True, port=3500)
@@ -0,0 +1,70 @@
+import os
+import sys
+from datetime import datetime, timedelta
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# database/config.py lee la conexión al importarse: sin DATABASE_URL pediría las variables de MySQL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import create_app  # noqa: E402
+from database.db import db  # noqa: E402
+from database.models import Admin, ContentVersion, Journal, Post  # noqa: E402
+from helpers.cache import MemoryBackend, api_cache  # noqa: E402
+
+
+# Cada app hace de worker de gunicorn con su propia caché en memoria: el singleton api_cache apunta
+# al backend del worker que atiende la petición
+class Worker:
+    def __init__(self, app):
+        self.app = app
+        self.backend = MemoryBackend()
+        self.client = app.test_client()
+
+    def get(self, path, **kwargs):
+        api_cache.backend = self.backend
+        return self.client.get(path, **kwargs)
+
+    def post(self, path, **kwargs):
+        api_cache.backend = self.backend
+        return self.client.post(path, **kwargs)
+
+    def login(self):
+        response = self.post("/login", data={"name": "admin", "password": "password1"})
+        assert response.status_code == 302
+
+
+@pytest.fixture
+def database_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'penumbra.db'}"
+
+
+# Apps independientes sobre el mismo archivo SQLite, como los workers de gunicorn sobre la misma base
+@pytest.fixture
+def make_app(tmp_path, database_url):
+    def make(**config):
+        return create_app(dict({
+            "TESTING": True,
+            "WTF_CSRF_ENABLED": False,
+            "SQLALCHEMY_DATABASE_URI": database_url,
+            "SQLALCHEMY_BINDS": {},
+            "JOB_QUEUE_PATH": str(tmp_path / "jobs.sqlite3"),
+            "JOB_WORKERS": 0,
+        }, **config))
+    return make
+
+
+def seed(app, posts=3, journals=2):
+    with app.app_context():
+        db.create_all(bind_key=None)
+        db.session.add(Admin(name="admin", email="admin@example.com", password="password1"))
+        base = datetime(2024, 1, 1)
+        for n in range(posts):
+            db.session.add(Post(author="ana", category="cuentos", slug=f"post-{n}", title=f"Post {n}",
+                                content="palabra " * 50, date=base + timedelta(days=n)))
+        for n in range(journals):
+            db.session.add(Journal(number=n + 1, year=2024, title=f"Journal {n}",
+                                   url=f"https://example.com/{n}", date=base + timedelta(days=n)))
+        ContentVersion.bump("posts")
+        ContentVersion.bump("journals")
+        db.session.commit()
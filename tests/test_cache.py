@@ -0,0 +1,43 @@
+from conftest import Worker, seed
+
+
+def edit_post(worker, post_id, title):
+    response = worker.post(f"/admin/mod_post/{post_id}", data={
+        "author": "ana", "title": title, "image": "https://example.com/a.jpg", "content": "texto nuevo",
+        "category": "cuentos", "slug": f"post-{post_id - 1}",
+    })
+    assert response.status_code == 302
+
+
+# Una escritura atendida por un worker no deja a los demás sirviendo su copia en caché
+def test_write_reaches_every_worker(make_app):
+    first, second = Worker(make_app()), Worker(make_app())
+    seed(first.app)
+
+    for worker in (first, second):
+        assert worker.get("/api/posts/1").json["title"] == "Post 0"
+    stale = second.get("/api/posts/1")
+    assert stale.headers["X-Cache"] == "HIT"
+
+    first.login()
+    edit_post(first, 1, "Editado")
+
+    fresh = second.get("/api/posts/1")
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert fresh.json["title"] == "Editado"
+    assert fresh.headers["ETag"] != stale.headers["ETag"]
+
+    # El ETag viejo ya no revalida: el cliente recibe el contenido nuevo
+    revalidated = second.get("/api/posts/1", headers={"If-None-Match": stale.headers["ETag"]})
+    assert revalidated.status_code == 200
+    assert revalidated.json["title"] == "Editado"
+
+
+def test_etag_matches_cached_body(make_app):
+    worker = Worker(make_app())
+    seed(worker.app)
+
+    first = worker.get("/api/posts")
+    cached = worker.get("/api/posts", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert worker.get("/api/posts").headers["X-Cache"] == "HIT"
@@ -0,0 +1,26 @@
+from conftest import Worker, seed
+from helpers.feeds import MAX_FRAGMENT_SETS, feeds
+
+
+# Sin SITE_URL cualquier cabecera Host sirve para los enlaces, pero no queda nada guardado por host
+def test_feed_fragments_ignore_request_host(make_app):
+    worker = Worker(make_app(SITE_URL=None))
+    seed(worker.app)
+    feeds._fragments.clear()
+
+    for n in range(20):
+        response = worker.get("/feed.xml", headers={"Host": f"attacker-{n}.example"})
+        assert f"http://attacker-{n}.example/posts/post-0".encode() in response.data
+    assert not feeds._fragments
+
+
+def test_feed_fragments_are_reused_with_site_url(make_app):
+    worker = Worker(make_app(SITE_URL="https://penumbra.example"))
+    seed(worker.app)
+    feeds._fragments.clear()
+
+    for path in ("/feed.xml", "/atom.xml", "/sitemap.xml", "/feed.xml?x=1"):
+        response = worker.get(path, headers={"Host": "attacker.example"})
+        assert b"https://penumbra.example/posts/post-0" in response.data
+        assert b"attacker.example" not in response.data
+    assert len(feeds._fragments) == 3 <= MAX_FRAGMENT_SETS
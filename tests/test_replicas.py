@@ -0,0 +1,34 @@
+import sqlite3
+from conftest import Worker, seed
+
+
+# Copia la primaria sobre la réplica, como cuando la réplica termina de aplicar los cambios
+def catch_up(primary_path, replica_path):
+    with sqlite3.connect(primary_path) as source, sqlite3.connect(replica_path) as target:
+        source.backup(target)
+
+
+# Justo después de una escritura, una réplica atrasada no deja su copia vieja bajo la versión nueva
+def test_lagging_replica_does_not_cache_stale_rows(make_app, tmp_path):
+    primary_path, replica_path = tmp_path / "penumbra.db", tmp_path / "replica.db"
+    config = {"SQLALCHEMY_BINDS": {"replica_1": f"sqlite:///{replica_path}"}}
+    admin, reader = Worker(make_app(**config)), Worker(make_app(**config))
+    seed(admin.app)
+    catch_up(primary_path, replica_path)
+
+    admin.login()
+    response = admin.post("/admin/mod_post/1", data={
+        "author": "ana", "title": "Editado", "image": "https://example.com/a.jpg", "content": "texto nuevo",
+        "category": "cuentos", "slug": "post-0",
+    })
+    assert response.status_code == 302
+
+    lagging = reader.get("/api/posts/1")
+    assert lagging.json["title"] == "Post 0"
+
+    catch_up(primary_path, replica_path)
+    fresh = reader.get("/api/posts/1")
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert fresh.json["title"] == "Editado"
+    assert fresh.headers["ETag"] != lagging.headers["ETag"]
+    assert reader.get("/api/posts/1", headers={"If-None-Match": lagging.headers["ETag"]}).status_code == 200
@@ -0,0 +1,31 @@
+from conftest import Worker, seed
+from database.db import db
+from database.models import Post
+
+
+def add_post(app, slug, title, content):
+    with app.app_context():
+        db.session.add(Post(author="ana", category="musica", slug=slug, title=title, content=content))
+        db.session.commit()
+
+
+# El respaldo LIKE de SQLite pliega las tildes del texto y de la consulta, sin comodines que acepten
+# cualquier letra en lugar de las vocales
+def test_sqlite_search_folds_accents(make_app):
+    worker = Worker(make_app())
+    seed(worker.app)
+    add_post(worker.app, "cancion", "Una Canción de cuna", "letra")
+    add_post(worker.app, "cincuenta", "Cincuenta años", "c1nc0 canicas")
+
+    for query in ("cancion", "canción", "CANCIONES"):
+        slugs = [item["slug"] for item in worker.get(f"/api/posts/search?q={query}").json]
+        assert slugs == ["cancion"]
+
+
+def test_sqlite_search_escapes_like_wildcards(make_app):
+    worker = Worker(make_app())
+    seed(worker.app)
+    add_post(worker.app, "guion", "snake_case", "texto")
+
+    assert [item["slug"] for item in worker.get("/api/posts/search?q=snake_case").json] == ["guion"]
+    assert worker.get("/api/posts/search?q=snakexcase").json == []
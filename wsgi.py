@@ -5,7 +5,13 @@ from dotenv import load_dotenv
 # Cargar variables de entorno
 load_dotenv()
 
-# Añadir el directorio de tu aplicación al path
-sys.path.insert(0, "/home/penuaav/loko.penumbra.press")
+# Añadir el directorio de la aplicación al path (Passenger no arranca desde él)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app as application
+from app import create_app, warm_up  # noqa: E402
+
+application = create_app()
+
+# Con gunicorn --preload esto corre una sola vez en el proceso maestro; sin él, al arrancar cada worker
+# y no durante su primera petición
+warm_up(application)